@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+'''
+Memory used by the objects of a parsed document with many line items, once
+with regular (__dict__ based) complex types and once with COMPACT = True.
+
+Usage: python benchmarks/compact_memory.py [number of lines]
+'''
+
+from __future__ import print_function
+
+import gc
+import sys
+import tracemalloc
+
+from soapfish import xsd
+
+
+def build_types(compact):
+    class Line(xsd.ComplexType):
+        COMPACT = compact
+        number = xsd.Attribute(xsd.Integer)
+        sku = xsd.Element(xsd.String)
+        description = xsd.Element(xsd.String)
+        quantity = xsd.Element(xsd.Integer)
+        price = xsd.Element(xsd.Decimal)
+
+    class Order(xsd.ComplexType):
+        COMPACT = compact
+        id = xsd.Element(xsd.String)
+        lines = xsd.ListElement(Line, 'line')
+
+    return Order
+
+
+def build_document(count):
+    lines = ''.join(
+        '<line number="%d"><sku>SKU-%d</sku><description>Item %d</description>'
+        '<quantity>%d</quantity><price>%d.50</price></line>' % (i, i, i, i % 10, i % 100)
+        for i in range(count)
+    )
+    return '<order><id>4711</id>%s</order>' % lines
+
+
+def measure(Order, xml):
+    gc.collect()
+    tracemalloc.start()
+    order = Order.parsexml(xml)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(order.lines) > 0
+    return current
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 20000
+    xml = build_document(count)
+    regular = measure(build_types(compact=False), xml)
+    compact = measure(build_types(compact=True), xml)
+    print('%d lines' % count)
+    print('regular: %8.1f MiB' % (regular / 2.0 ** 20))
+    print('compact: %8.1f MiB (%.0f%%)' % (compact / 2.0 ** 20, 100.0 * compact / regular))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
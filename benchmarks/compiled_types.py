@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+'''
+Time for parsing and rendering a typical request document with the generic
+code in xsd.py and with the functions generated by Schema.compile().
+
+Usage: python benchmarks/compiled_types.py [number of iterations]
+'''
+
+from __future__ import print_function
+
+import sys
+import timeit
+
+from lxml import etree
+
+from soapfish import xsd
+
+
+class Address(xsd.ComplexType):
+    street = xsd.Element(xsd.String)
+    city = xsd.Element(xsd.String)
+    zip = xsd.Element(xsd.String)
+
+
+class Line(xsd.ComplexType):
+    number = xsd.Attribute(xsd.Integer)
+    sku = xsd.Element(xsd.String)
+    description = xsd.Element(xsd.String, minOccurs=0)
+    quantity = xsd.Element(xsd.Integer)
+    price = xsd.Element(xsd.Decimal)
+
+
+class Order(xsd.ComplexType):
+    id = xsd.Element(xsd.String)
+    created = xsd.Element(xsd.DateTime)
+    express = xsd.Element(xsd.Boolean)
+    address = xsd.Element(Address)
+    lines = xsd.ListElement(Line, 'line')
+    notes = xsd.ListElement(xsd.String, 'note', minOccurs=0)
+
+
+SCHEMA = xsd.Schema(
+    targetNamespace='http://benchmark.example/orders',
+    elementFormDefault=xsd.ElementFormDefault.QUALIFIED,
+    complexTypes=[Address, Line, Order],
+    elements={'order': xsd.Element(Order)},
+)
+
+
+def build_document(count):
+    lines = ''.join(
+        '<line number="%d"><sku>SKU-%d</sku><description>Item %d</description>'
+        '<quantity>%d</quantity><price>%d.50</price></line>' % (i, i, i, i % 10, i % 100)
+        for i in range(count)
+    )
+    return (
+        '<order><id>4711</id><created>2017-01-02T03:04:05Z</created><express>true</express>'
+        '<address><street>Main Street 1</street><city>Springfield</city><zip>12345</zip></address>'
+        '%s<note>first</note><note>second</note></order>' % lines
+    )
+
+
+def measure(xmlelement, iterations):
+    order = Order.parse_xmlelement(xmlelement)
+    parse = min(timeit.repeat(lambda: Order.parse_xmlelement(xmlelement), number=iterations, repeat=3))
+    render = min(timeit.repeat(lambda: order.xml('order', pretty_print=False), number=iterations, repeat=3))
+    return order, parse, render
+
+
+def main(argv):
+    iterations = int(argv[1]) if len(argv) > 1 else 2000
+    xmlelement = etree.fromstring(build_document(20))
+    generic_order, generic_parse, generic_render = measure(xmlelement, iterations)
+    SCHEMA.compile()
+    compiled_order, compiled_parse, compiled_render = measure(xmlelement, iterations)
+    assert generic_order == compiled_order
+    assert generic_order.xml('order') == compiled_order.xml('order')
+
+    print('%d iterations' % iterations)
+    print('          generic  compiled  speedup')
+    for name, generic, compiled in (('parse', generic_parse, compiled_parse),
+                                    ('render', generic_render, compiled_render)):
+        print('%-8s %7.3fs  %7.3fs  %6.1fx' % (name, generic, compiled, generic / compiled))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+'''
+Latency of a SOAP request handled by the Flask adapter with one shared
+SOAPDispatcher (flask_dispatcher) and with a new dispatcher for every request
+(how the adapters used to work). Requires Flask.
+
+Usage: python benchmarks/flask_dispatch.py [number of requests]
+'''
+
+from __future__ import print_function
+
+import functools
+import sys
+import timeit
+
+import flask
+
+from soapfish import soap, xsd
+from soapfish.core import SOAPRequest, SOAPResponse
+from soapfish.flask_ import flask_dispatcher
+from soapfish.soap_dispatch import SOAPDispatcher
+
+
+class EchoType(xsd.ComplexType):
+    value = xsd.Element(xsd.String)
+
+
+def echo(request, echoRequest):
+    return SOAPResponse(EchoType(value=echoRequest.value))
+
+
+def echo_service():
+    schema = xsd.Schema(
+        'http://benchmark.example/echo/types',
+        complexTypes=[EchoType],
+        elements={'echoRequest': xsd.Element(EchoType), 'echoResponse': xsd.Element(EchoType)},
+    )
+    method = xsd.Method(function=echo, soapAction='echo', input='echoRequest', output='echoResponse',
+                        operationName='echoOperation')
+    return soap.Service(name='EchoService', targetNamespace='http://benchmark.example/echo',
+                        location='http://benchmark.example/ws', schemas=[schema], methods=[method])
+
+
+def per_request_dispatcher(service):
+    def flask_dispatch():
+        soap_request = SOAPRequest(flask.request.environ, flask.request.data)
+        soap_response = SOAPDispatcher(service).dispatch(soap_request)
+        return flask.Response(soap_response.http_content, status=soap_response.http_status_code,
+                              headers=soap_response.http_headers)
+    return flask_dispatch
+
+
+def main(argv):
+    requests = int(argv[1]) if len(argv) > 1 else 500
+    service = echo_service()
+    app = flask.Flask(__name__)
+    app.add_url_rule('/before/', 'before', per_request_dispatcher(service), methods=['POST'])
+    app.add_url_rule('/after/', 'after', flask_dispatcher(service), methods=['POST'])
+    client = app.test_client()
+
+    method = service.get_method('echoOperation')
+    headers = service.version.build_http_request_headers(method.soapAction)
+    body = service.version.Envelope.response(method.input, EchoType(value='hello'))
+
+    print('%d requests' % requests)
+    for path in ('/before/', '/after/'):
+        post = functools.partial(client.post, path, data=body, headers=headers)
+        assert post().status_code == 200
+        seconds = min(timeit.repeat(post, number=requests, repeat=3))
+        print('%-9s %8.3fms per request' % (path.strip('/'), seconds / requests * 1000))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+'''
+Time for importing a synthetic module in the style of the code generated by
+wsdl2py/xsd2py with many complex types (5000 by default) and for using a few
+of the types afterwards.
+
+Usage: python benchmarks/import_types.py [number of types] [lazy]
+
+With 'lazy' the module is generated like with xsd2py --lazy.
+'''
+
+from __future__ import print_function
+
+import sys
+import time
+import types
+
+import six
+
+from soapfish import lazy, xsd  # NOQA (imported before the time is measured)
+
+
+TYPE_TEMPLATE = '''
+class Type{i}(xsd.ComplexType):
+    INHERITANCE = None
+    INDICATOR = xsd.Sequence
+    id = xsd.Attribute(xsd.String, use=xsd.Use.REQUIRED)
+    name = xsd.Element(xsd.String(maxLength=40))
+    created = xsd.Element(xsd.DateTime, minOccurs=0)
+    amount = xsd.Element(xsd.Decimal(fractionDigits=2), minOccurs=0)
+    parent = xsd.Element({parent}, minOccurs=0)
+    items = xsd.ListElement(xsd.Integer, 'item', minOccurs=0, maxOccurs=xsd.UNBOUNDED)
+'''
+
+
+def build_module(count):
+    lines = ['from soapfish import xsd', '']
+    for i in range(count):
+        lines.append(TYPE_TEMPLATE.format(i=i, parent="'__synthetic__.Type%d'" % (i - 1) if i else 'xsd.String'))
+    lines.append('Schema = xsd.Schema(')
+    lines.append("    targetNamespace='http://benchmark.example/types',")
+    lines.append('    complexTypes=[%s],' % ', '.join('Type%d' % i for i in range(count)))
+    lines.append("    elements={'root': xsd.Element('__synthetic__.Type%d')}," % (count - 1))
+    lines.append(')')
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 5000
+    source = build_module(count)
+    if 'lazy' in argv[2:]:
+        source = lazy.make_lazy(source)
+    # compiled up front, only the execution of the module code is measured
+    code = compile(source, 'synthetic.py', 'exec')
+
+    start = time.time()
+    module = sys.modules['__synthetic__'] = types.ModuleType('__synthetic__')
+    six.exec_(code, module.__dict__)
+    imported = time.time()
+    for i in range(0, count, count // 10 or 1):
+        getattr(module, 'Type%d' % i)(id='x', name='name').xml('type')
+    used = time.time()
+
+    print('%d complex types' % count)
+    print('import   %7.3fs' % (imported - start))
+    print('use      %7.3fs' % (used - imported))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
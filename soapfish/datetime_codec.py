@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+'''
+Conversion between the text values of xsd:date, xsd:dateTime, xsd:time and
+the Python values used by the corresponding types in xsd.py.
+
+Values in the usual extended format (e.g. 2001-10-26T21:32:52.5+02:00) are
+parsed with a single precompiled regex, everything else is handed to iso8601
+so the accepted syntax does not change. Time zones with the same offset share
+one tzinfo instance and values are formatted without strftime().
+'''
+
+from __future__ import absolute_import
+
+import re
+from datetime import datetime, time
+
+import iso8601
+
+from .utils import timezone_offset_to_string
+
+
+DATE_REGEX = re.compile(r'''
+    ^(\-)?
+    (?P<year>\d{4,})\-(?P<month>\d{2})\-(?P<day>\d{2})
+    (?P<timezone>
+            Z
+            |
+            (
+                (?P<tz_sign>[-+])
+                (?P<tz_hour>[0-9]{2})
+                :{0,1}
+                (?P<tz_minute>[0-9]{2}){0,1}
+            )
+        )?$''', re.VERBOSE)
+
+DATETIME_REGEX = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?'
+    r'(Z|[-+]\d{2}:?\d{2})?$'
+)
+
+TIME_REGEX = re.compile(r'^(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(Z|[-+]\d{2}:?\d{2})?$')
+
+_timezones = {'Z': iso8601.UTC}
+_offsets = {}
+
+
+def get_timezone(offset_string):
+    '''
+    Returns the tzinfo for a time zone designator like 'Z', '+01:00' or
+    '-0230'. All designators for the same offset return the same instance.
+    '''
+    try:
+        return _timezones[offset_string]
+    except KeyError:
+        pass
+    sign = -1 if offset_string[0] == '-' else 1
+    hours = int(offset_string[1:3])
+    minutes = int(offset_string[-2:]) if len(offset_string) > 3 else 0
+    name = '%s%02d:%02d' % (offset_string[0], hours, minutes)
+    tz = _timezones.get(name)
+    if tz is None:
+        tz = _timezones.setdefault(name, iso8601.FixedOffset(sign * hours, sign * minutes, name))
+    return _timezones.setdefault(offset_string, tz)
+
+
+def format_offset(tz, value):
+    '''
+    Returns the time zone suffix for a value with the tzinfo tz ('' for
+    naive values), see timezone_offset_to_string().
+    '''
+    if not tz:
+        return ''
+    offset = tz.utcoffset(value)
+    try:
+        return _offsets[offset]
+    except KeyError:
+        return _offsets.setdefault(offset, timezone_offset_to_string(offset))
+
+
+def _microsecond(fraction):
+    return int(fraction.ljust(6, '0')) if fraction else 0
+
+
+def parse_date(value):
+    '''
+    Returns (year, month, day, tzinfo) for a xsd:date text value.
+    '''
+    match = DATE_REGEX.match(value)
+    if match is None:
+        raise ValueError('Unable to parse date string %r' % value)
+    year, month, day, offset_string = match.group('year', 'month', 'day', 'timezone')
+    tz = get_timezone(offset_string) if offset_string else None
+    return int(year), int(month), int(day), tz
+
+
+def parse_datetime(value):
+    '''
+    Returns the datetime for a xsd:dateTime text value. Values without a time
+    zone are in UTC (like iso8601.parse_date()).
+    '''
+    match = DATETIME_REGEX.match(value)
+    if match is not None:
+        year, month, day, hour, minute, second, fraction, offset_string = match.groups()
+        tz = get_timezone(offset_string) if offset_string else iso8601.UTC
+        try:
+            return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                            _microsecond(fraction), tz)
+        except ValueError:
+            pass  # iso8601 raises the usual ParseError
+    return iso8601.parse_date(value)
+
+
+def parse_time(value):
+    '''
+    Returns the time for a xsd:time text value. Values without a time zone are
+    in UTC.
+    '''
+    match = TIME_REGEX.match(value)
+    if match is not None:
+        hour, minute, second, fraction, offset_string = match.groups()
+        tz = get_timezone(offset_string) if offset_string else iso8601.UTC
+        try:
+            return time(int(hour), int(minute), int(second), _microsecond(fraction), tz)
+        except ValueError:
+            pass
+    try:
+        dt = iso8601.parse_date('1900-01-01T' + value)
+    except Exception as e:
+        raise ValueError(e)
+    return dt.time().replace(tzinfo=dt.tzinfo)
+
+
+def format_date(value):
+    '''
+    Returns the xsd:date text for a date (or XSDDate), including the time
+    zone if the value has one.
+    '''
+    return '%04d-%02d-%02d%s' % (value.year, value.month, value.day,
+                                 format_offset(getattr(value, 'tzinfo', None), None))
+
+
+def format_datetime(value):
+    '''
+    Returns the xsd:dateTime text for a datetime (without microseconds).
+    '''
+    return '%04d-%02d-%02dT%02d:%02d:%02d%s' % (
+        value.year, value.month, value.day, value.hour, value.minute, value.second,
+        format_offset(value.tzinfo, value))
+
+
+def format_time(value):
+    '''
+    Returns the xsd:time text for a time (without microseconds).
+    '''
+    return '%02d:%02d:%02d%s' % (value.hour, value.minute, value.second, format_offset(value.tzinfo, None))
@@ -3,7 +3,7 @@
 from __future__ import absolute_import
 
 from soapfish.core import SOAPRequest
-from soapfish.soap_dispatch import SOAPDispatcher
+from soapfish.soap_dispatch import shared_dispatcher
 
 __all__ = ['django_dispatcher']
 
@@ -21,15 +21,21 @@ class DjangoEnvironWrapper(object):
         return default
 
 
-def django_dispatcher(service, **dispatcher_kwargs):
+def django_dispatcher(service, lazy=False, **dispatcher_kwargs):
+    '''
+    Returns a view for the service. All requests are handled by one
+    SOAPDispatcher (created with dispatcher_kwargs) which is created right
+    away or, with lazy=True, by the first request.
+    '''
     from django.http import HttpResponse
     from django.views.decorators.csrf import csrf_exempt
 
+    get_dispatcher = shared_dispatcher(service, lazy, **dispatcher_kwargs)
+
     def django_dispatch(request):
         soap_request = SOAPRequest(DjangoEnvironWrapper(request.environ), request.body)
         soap_request._original_request = request
-        soap_dispatcher = SOAPDispatcher(service, **dispatcher_kwargs)
-        soap_response = soap_dispatcher.dispatch(soap_request)
+        soap_response = get_dispatcher().dispatch(soap_request)
 
         response = HttpResponse(soap_response.http_content)
         response.status_code = soap_response.http_status_code
@@ -3,19 +3,25 @@
 from __future__ import absolute_import
 
 from soapfish.core import SOAPRequest
-from soapfish.soap_dispatch import SOAPDispatcher
+from soapfish.soap_dispatch import shared_dispatcher
 
 __all__ = ['flask_dispatcher']
 
 
-def flask_dispatcher(service, **dispatcher_kwargs):
+def flask_dispatcher(service, lazy=False, **dispatcher_kwargs):
+    '''
+    Returns a view for the service. All requests are handled by one
+    SOAPDispatcher (created with dispatcher_kwargs) which is created right
+    away or, with lazy=True, by the first request.
+    '''
     from flask import request, Response
 
+    get_dispatcher = shared_dispatcher(service, lazy, **dispatcher_kwargs)
+
     def flask_dispatch():
         soap_request = SOAPRequest(request.environ, request.data)
         soap_request._original_request = request
-        soap_dispatcher = SOAPDispatcher(service, **dispatcher_kwargs)
-        soap_response = soap_dispatcher.dispatch(soap_request)
+        soap_response = get_dispatcher().dispatch(soap_request)
 
         response = Response(soap_response.http_content)
         response.status_code = soap_response.http_status_code
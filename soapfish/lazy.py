@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+'''
+Generated modules which define their types on first use (xsd2py --lazy,
+wsdl2py --lazy).
+
+make_lazy() rewrites the code generated by xsd2py/wsdl2py: every top level
+class, function and assignment is moved into a function which is called by the
+module __getattr__ (PEP 562, the generated module requires Python 3.7+) when
+the name is used for the first time. The schemas refer to their types by
+import path (see the lazy parameter of xsd.Schema) so they can be used
+without defining all types.
+'''
+
+from __future__ import absolute_import
+
+import ast
+import collections
+import dis
+import io
+import sys
+import threading
+import tokenize
+import types
+
+import six
+
+
+# --- Runtime -----------------------------------------------------------------
+def module_loader(namespace, definitions):
+    '''
+    Returns the functions __getattr__ and __dir__ for a module with the
+    globals namespace. definitions maps every name which is not defined yet to
+    a function defining it in namespace. The names used by a definition are
+    defined before.
+    '''
+    lock = threading.RLock()
+    pending = dict(definitions)
+
+    def define(name):
+        definition = pending.pop(name, None)
+        if definition is None:
+            return  # defined already (or being defined by this thread)
+        try:
+            for dependency in _loaded_globals(definition.__code__, pending.keys()):
+                define(dependency)
+            definition()
+        except Exception:
+            pending[name] = definition
+            raise
+
+    def __getattr__(name):
+        if name in definitions:
+            with lock:
+                define(name)
+            if name in namespace:
+                return namespace[name]
+        raise AttributeError('module %r has no attribute %r' % (namespace['__name__'], name))
+
+    def __dir__():
+        return sorted(set(namespace).union(definitions))
+
+    return __getattr__, __dir__
+
+
+def _loaded_globals(code, names):
+    '''The names in names which are loaded from the globals by code.'''
+    loaded = set()
+    if not names.isdisjoint(code.co_names):  # co_names has attribute names too
+        for instruction in dis.get_instructions(code):
+            if instruction.opname in ('LOAD_GLOBAL', 'LOAD_NAME') and instruction.argval in names:
+                loaded.add(instruction.argval)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            loaded.update(_loaded_globals(const, names))
+    return loaded
+
+
+# --- Code generation ---------------------------------------------------------
+SCHEMA_TYPE_LISTS = ('simpleTypes', 'attributeGroups', 'groups', 'complexTypes')
+
+
+def make_lazy(code):
+    '''
+    Returns the generated code (text) rewritten as lazily loaded module.
+    '''
+    if sys.version_info < (3, 8):
+        raise RuntimeError('Generating lazy code requires Python 3.8 or later.')
+    lines = [line.encode('utf-8') for line in code.splitlines(True)]
+    module = ast.parse(code)
+    edits = []  # (line, start column, end column, new text) in bytes
+    eager, definitions = [], {}
+    block = {}  # classes defined since the last schema
+    # Names bound several times (e.g. the schemas of includes and imports):
+    # every binding but the last one gets its own name.
+    bindings = collections.Counter(_bound_name(node) for node in module.body)
+    current = {}  # rebound name -> name of the binding in effect
+
+    for node in module.body:
+        name = _bound_name(node)
+        loads = list(_evaluated_loads(node))  # evaluated before the name is bound
+        node_edits = []
+        rebound = None
+        if name is not None:
+            bindings[name] -= 1
+            if bindings[name] or name in current:
+                if not isinstance(node, ast.Assign):
+                    raise ValueError('%r is defined several times, the code can not be loaded lazily.' % name)
+                binding = '_%s_%d' % (name, len(definitions)) if bindings[name] else name
+                target = node.targets[0]
+                node_edits.append((target.lineno - 1, target.col_offset, target.end_col_offset,
+                                   binding.encode('utf-8')))
+                rebound, name = name, binding
+        if _is_schema(node):
+            node_edits.extend(_schema_edits(node, name, block, current))
+            block = {}
+        edited = set((line, start) for line, start, end, text in node_edits)
+        for load in loads:
+            if load.id in current and (load.lineno - 1, load.col_offset) not in edited:
+                node_edits.append((load.lineno - 1, load.col_offset, load.end_col_offset,
+                                   current[load.id].encode('utf-8')))
+        edits.extend(node_edits)
+        if name is None:
+            eager.append(node)
+            continue
+        if rebound is not None:
+            current[rebound] = name
+        definitions[name] = node
+        if isinstance(node, ast.ClassDef):
+            block[name] = node
+    for line, start, end, text in sorted(edits, reverse=True):
+        lines[line] = lines[line][:start] + text + lines[line][end:]
+
+    strings = _multiline_string_lines(code)
+    output = [b''.join(lines[:module.body[0].lineno - 1]) if module.body else b'']
+    for node in eager:
+        output.append(b''.join(lines[_first_line(node):node.end_lineno]))
+    output.append(b'from soapfish import lazy\n')
+    for name, node in definitions.items():
+        output.append(('\n\ndef _define_%s():\n    global %s\n\n' % (name, name)).encode('utf-8'))
+        for index in range(_first_line(node), node.end_lineno):
+            # a line may contain several lines after the edits
+            for n, line in enumerate(lines[index].splitlines(True)):
+                indent = line.strip() and (n > 0 or (index + 1) not in strings)
+                output.append(b'    ' + line if indent else line)
+        if not output[-1].endswith(b'\n'):
+            output.append(b'\n')
+    output.append(b'\n\n__getattr__, __dir__ = lazy.module_loader(globals(), {\n')
+    for name in definitions:
+        output.append(("    '%s': _define_%s,\n" % (name, name)).encode('utf-8'))
+    output.append(b'})\n')
+    return b''.join(output).decode('utf-8')
+
+
+def _bound_name(node):
+    if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+        return node.name
+    if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+        return node.targets[0].id
+    return None
+
+
+def _first_line(node):
+    '''Index of the first line of a top level statement (with decorators).'''
+    return min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', ())]) - 1
+
+
+def _is_schema(node):
+    func = getattr(node.value, 'func', None) if isinstance(node, ast.Assign) else None
+    return (isinstance(func, ast.Attribute) and func.attr == 'Schema') or \
+        (isinstance(func, ast.Name) and func.id == 'Schema')
+
+
+def _evaluated_loads(node):
+    '''
+    The names loaded when the top level statement node is executed (not by
+    the functions it defines).
+    '''
+    nodes = [node]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            nodes.extend(getattr(node, 'decorator_list', ()))
+            nodes.extend(node.args.defaults + [d for d in node.args.kw_defaults if d is not None])
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            yield node
+        nodes.extend(ast.iter_child_nodes(node))
+
+
+def _schema_edits(node, schema_name, classes, current):
+    '''
+    Replaces the types in the schema definition node (bound to schema_name)
+    by their import paths, adds lazy=True and assigns SCHEMA in the classes of
+    the listed types. current maps rebound names to their bindings in effect.
+    '''
+    call = node.value
+    names = []  # (name, suffix of the import path)
+    for keyword in call.keywords:
+        if keyword.arg in SCHEMA_TYPE_LISTS and isinstance(keyword.value, ast.List):
+            names.extend((n, '') for n in keyword.value.elts if isinstance(n, ast.Name))
+        elif keyword.arg == 'elements' and isinstance(keyword.value, ast.Dict):
+            for element in keyword.value.values:
+                if not (isinstance(element, ast.Call) and element.args):
+                    continue
+                _type = element.args[0]
+                if isinstance(_type, ast.Call) and isinstance(_type.func, ast.Name) and not _type.args:
+                    # an (anonymous) instance of a type: Type(), see: xsd.import_type()
+                    names.append((ast.copy_location(_type.func, _type), '()'))
+                else:
+                    names.append((_type, ''))
+
+    edits = []
+    for name, suffix in names:
+        if not isinstance(name, ast.Name):
+            continue
+        text = ("__name__ + '.%s%s'" % (current.get(name.id, name.id), suffix)).encode('utf-8')
+        edits.append((name.lineno - 1, name.col_offset, name.end_col_offset, text))
+        cls = classes.pop(name.id, None)
+        if cls is not None:
+            edits.append(_class_attribute_edit(cls, 'SCHEMA = %s' % schema_name))
+    if not (call.keywords or call.args):
+        return edits
+    last = call.keywords[-1].value if call.keywords else call.args[-1]
+    edits.append((last.end_lineno - 1, last.end_col_offset, last.end_col_offset, b', lazy=True'))
+    return edits
+
+
+def _class_attribute_edit(cls, statement):
+    statement = statement.encode('utf-8')
+    first = cls.body[0]
+    if first.lineno == cls.lineno:  # class X(Y): pass
+        return (cls.end_lineno - 1, cls.end_col_offset, cls.end_col_offset, b'; ' + statement)
+    indent = b' ' * first.col_offset
+    if _is_docstring(first):
+        return (first.end_lineno - 1, first.end_col_offset, first.end_col_offset, b'\n' + indent + statement)
+    return (first.lineno - 1, 0, 0, indent + statement + b'\n')
+
+
+def _is_docstring(node):
+    return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and \
+        isinstance(node.value.value, six.string_types)
+
+
+def _multiline_string_lines(code):
+    '''Numbers of the lines which continue a string of the previous line.'''
+    lines = set()
+    if not any(quote in code for quote in ('"""', "'''", '\\\n')):
+        return lines
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type == tokenize.STRING and token.end[0] > token.start[0]:
+            lines.update(range(token.start[0] + 1, token.end[0] + 1))
+    return lines
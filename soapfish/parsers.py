@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+'''
+Preconfigured lxml parsers shared by the parsing entry points
+(ComplexType.parsexml(), SOAPDispatcher and Stub).
+
+lxml parsers must not be used by several threads at the same time so every
+thread has its own parser for each configuration. Unlike the default parser
+of lxml they don't resolve entities (SOAP messages must not contain a DTD).
+'''
+
+from __future__ import absolute_import
+
+import threading
+from collections import OrderedDict
+
+from lxml import etree
+
+__all__ = ['DEFAULT_OPTIONS', 'fromstring', 'get_parser']
+
+DEFAULT_OPTIONS = {
+    'remove_blank_text': False,
+    'huge_tree': False,
+    'resolve_entities': False,
+}
+MAX_PARSERS = 32  # per thread (least recently used first out), parsers bound to schemas keep the schema alive
+
+_local = threading.local()
+
+
+def get_parser(schema=None, **options):
+    '''
+    Returns the parser of the current thread for the options.
+
+    :param schema: lxml.etree.XMLSchema, if given the parser validates the
+        documents.
+    :param options: keyword arguments for lxml.etree.XMLParser which override
+        DEFAULT_OPTIONS, e.g. remove_blank_text=True or huge_tree=True.
+    '''
+    key = (schema, tuple(sorted(options.items())) if options else ())
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = OrderedDict()
+    parser = parsers.pop(key, None)
+    if parser is None:
+        kwargs = dict(DEFAULT_OPTIONS, **options)
+        parser = etree.XMLParser(schema=schema, **kwargs)
+        if len(parsers) >= MAX_PARSERS:
+            parsers.popitem(last=False)  # the least recently used parser
+    parsers[key] = parser
+    return parser
+
+
+def fromstring(xml, schema=None, **options):
+    '''
+    Parses xml (string) with the parser for schema and options, see:
+    get_parser().
+    '''
+    return etree.fromstring(xml, get_parser(schema, **options))
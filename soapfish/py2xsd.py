@@ -8,6 +8,8 @@ import imp
 import inspect
 import logging
 import sys
+import threading
+import weakref
 
 import six
 from lxml import etree
@@ -27,6 +29,9 @@ ALL_TYPES = NUMERIC_TYPES + STRING_TYPES
 
 logger = logging.getLogger('soapfish')
 
+_xml_schemas = weakref.WeakKeyDictionary()  # xsd.Schema -> (signature, etree.XMLSchema)
+_xml_schemas_lock = threading.Lock()
+
 
 # --- Helpers -----------------------------------------------------------------
 def get_xsd_type(_type):
@@ -221,6 +226,35 @@ def generate_xsd(schema):
     return xmlelement
 
 
+def get_xml_schema(schema):
+    """
+    Return the compiled lxml XMLSchema for the specified soapfish schema.
+    It is shared by all callers until the schema changes (namespace, types,
+    elements, imports or includes) so the XSD is generated and compiled once.
+    """
+    signature = _schema_signature(schema)
+    cached = _xml_schemas.get(schema)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    xml_schema = etree.XMLSchema(generate_xsd(schema))
+    with _xml_schemas_lock:
+        _xml_schemas[schema] = (signature, xml_schema)
+    return xml_schema
+
+
+def _schema_signature(schema):
+    # Everything generate_xsd() uses from the schema object itself.
+    return (
+        schema.targetNamespace,
+        schema.elementFormDefault,
+        tuple((i.targetNamespace, i.location) for i in schema.imports),
+        tuple(i.location for i in schema.includes),
+        tuple(schema.simpleTypes),
+        tuple(schema.complexTypes),
+        tuple(six.iteritems(schema.elements)),
+    )
+
+
 def schema_validator(schemas):
     """
     Return a callable for the specified soapfish schemas which can be used
@@ -260,8 +294,17 @@ def schema_validator(schemas):
     # conflicting namespace urls).
     schema_xml = b''.join(etree.tostring(generate_xsd(s)) for s in schemas)
     schema_element = etree.fromstring(schema_xml, parser)
-    xml_schema = etree.XMLSchema(schema_element)
-    return xml_schema.assertValid
+    validators = threading.local()
+    validators.xml_schema = etree.XMLSchema(schema_element)
+
+    def validate(xmlelement):
+        # An lxml validator keeps the errors of the last validation in its
+        # error_log so concurrent validations must not share an instance.
+        xml_schema = getattr(validators, 'xml_schema', None)
+        if xml_schema is None:
+            xml_schema = validators.xml_schema = etree.XMLSchema(schema_element)
+        xml_schema.assertValid(xmlelement)
+    return validate
 
 
 # --- Program -----------------------------------------------------------------
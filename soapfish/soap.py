@@ -67,6 +67,7 @@ class Service(object):
         self.location = location
         self.schemas = schemas
         self.methods = methods
+        self._methods_index = (None, {})
         self.version = version
         self.use_wsa = use_wsa
         if use_wsa and input_header is None:
@@ -77,7 +78,16 @@ class Service(object):
         self.output_header = output_header
 
     def get_method(self, operationName):
-        return next(m for m in self.methods if m.operationName == operationName)
+        # The index is rebuilt if the list of methods is replaced or a name is
+        # not found (methods may have been added).
+        methods, methods_by_name = self._methods_index
+        if methods is self.methods and operationName in methods_by_name:
+            return methods_by_name[operationName]
+        methods_by_name = {}
+        for method in reversed(self.methods):
+            methods_by_name[method.operationName] = method
+        self._methods_index = (self.methods, methods_by_name)
+        return methods_by_name[operationName]
 
     def find_element_by_name(self, name):
         element = None
@@ -104,6 +114,9 @@ class Stub(object):
     SERVICE = None
     SCHEME = 'http'
     HOST = 'www.example.net'
+    KEEP_XMLELEMENT = True  # If False response objects don't reference the response XML.
+    LAZY = False            # If True response fields are parsed on first access.
+    PARSER_OPTIONS = {}     # Options for the lxml parser, see: soapfish.parsers.get_parser().
 
     def __init__(self, username=None, password=None, service=None, location=None):
         self.username = username
@@ -123,10 +136,11 @@ class Stub(object):
 
     def _handle_response(self, method, http_headers, content):
         soap = self.service.version
-        envelope = soap.Envelope.parsexml(content)
+        envelope = soap.Envelope.parsexml(content, parser_options=self.PARSER_OPTIONS)
+        options = {'keep_xmlelement': self.KEEP_XMLELEMENT, 'lazy': self.LAZY}
 
         if envelope.Header and method and method.output_header:
-            response_header = envelope.Header.parse_as(method.output_header)
+            response_header = envelope.Header.parse_as(method.output_header, **options)
         else:
             response_header = None
 
@@ -140,7 +154,7 @@ class Stub(object):
         else:
             _type = method.output
 
-        body = envelope.Body.parse_as(_type)
+        body = envelope.Body.parse_as(_type, **options)
         return core.SOAPResponse(body, soap_header=response_header)
 
     def call(self, operationName, parameter, header=None):
@@ -44,8 +44,14 @@ class Header(xsd.ComplexType):
     def accept(self, value):
         return value
 
-    def parse_as(self, ContentType):
-        return ContentType.parse_xmlelement(self._xmlelement)
+    @classmethod
+    def parse_xmlelement(cls, xmlelement, **options):
+        # parse_as() works on the XML so the header always keeps it.
+        options['keep_xmlelement'] = True
+        return super(Header, cls).parse_xmlelement(xmlelement, **options)
+
+    def parse_as(self, ContentType, **options):
+        return ContentType.parse_xmlelement(self._xmlelement, **options)
 
     def render(self, parent, instance, namespace=None, elementFormDefault=None):
         return super(Header, self).render(parent, instance, namespace=instance.SCHEMA.targetNamespace,
@@ -68,8 +74,14 @@ class Body(xsd.ComplexType):
     message = xsd.ClassNamedElement(xsd.NamedType, minOccurs=0)
     Fault = xsd.Element(Fault, minOccurs=0)
 
-    def parse_as(self, ContentType):
-        return ContentType.parse_xmlelement(self._xmlelement[0])
+    @classmethod
+    def parse_xmlelement(cls, xmlelement, **options):
+        # parse_as() and content() work on the XML so the body always keeps it.
+        options['keep_xmlelement'] = True
+        return super(Body, cls).parse_xmlelement(xmlelement, **options)
+
+    def parse_as(self, ContentType, **options):
+        return ContentType.parse_xmlelement(self._xmlelement[0], **options)
 
     def content(self):
         return self._xmlelement[0]
@@ -2,32 +2,115 @@
 
 from __future__ import absolute_import
 
+import collections
 import functools
 import logging
+import random
 import re
 import string
+import threading
 
 import six
 from lxml import etree
 
-from . import py2wsdl, py2xsd, wsa
+from . import parsers, py2wsdl, py2xsd, wsa
 from .core import SOAPError, SOAPRequest, SOAPResponse
 from .utils import uncapitalize, walk_schema_tree
 
-__all__ = ['SOAPDispatcher']
+__all__ = ['SOAPDispatcher', 'ValidationPolicy', 'shared_dispatcher']
 
 logger = logging.getLogger(__name__)
 
 
-def call_method(request):
+def call_method(request, operation_chains=None):
     request.dispatcher._prepare_request(request)
+    if operation_chains:
+        call = operation_chains.get(request.method.operationName)
+        if call is not None:
+            return call(request)
+    return call_handler(request)
+
+
+def call_handler(request):
     response = request.method.function(request, request.soap_body)
     return response if isinstance(response, SOAPResponse) else SOAPResponse(response)
 
 
+def compose_middlewares(middlewares, call):
+    """
+    Return call wrapped in the middlewares (the first one is the outermost).
+    """
+    for middleware in reversed(middlewares):
+        call = functools.partial(middleware, next_call=call)
+    return call
+
+
+def shared_dispatcher(service, lazy=False, **dispatcher_kwargs):
+    """
+    Return a function returning the SOAPDispatcher for the service which is
+    created only once (the WSDL, XSDs and validator are generated when it is
+    created) and shared by all requests, e.g. by the framework adapters.
+    With lazy=True it is created by the first call instead of right away.
+    """
+    dispatchers = []
+    lock = threading.Lock()
+
+    def get_dispatcher():
+        if not dispatchers:
+            with lock:
+                if not dispatchers:
+                    dispatchers.append(SOAPDispatcher(service, **dispatcher_kwargs))
+        return dispatchers[0]
+
+    if not lazy:
+        get_dispatcher()
+    return get_dispatcher
+
+
+class ValidationPolicy(object):
+    """
+    Decides which requests and responses a SOAPDispatcher validates against
+    the XML schemas of the service and counts the validations in counters
+    (requests_validated, requests_skipped, request_failures and the same for
+    responses).
+
+    Args:
+        requests: OFF, SAMPLED or STRICT (the default, every request)
+        responses: OFF (the default), SAMPLED or STRICT; an invalid response
+            is replaced by a server fault
+        sample_rate: share of the messages which are validated with SAMPLED
+            (0 to 1)
+    """
+    OFF = 'off'
+    SAMPLED = 'sampled'
+    STRICT = 'strict'
+
+    def __init__(self, requests=STRICT, responses=OFF, sample_rate=0.1):
+        for mode in (requests, responses):
+            if mode not in (self.OFF, self.SAMPLED, self.STRICT):
+                raise ValueError('Invalid validation mode: %r' % mode)
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('Invalid sample rate: %r' % sample_rate)
+        self.requests = requests
+        self.responses = responses
+        self.sample_rate = sample_rate
+        self.counters = collections.Counter()
+        self._lock = threading.Lock()
+
+    def should_validate(self, mode):
+        if mode == self.SAMPLED:
+            return random.random() < self.sample_rate
+        return mode == self.STRICT
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+
 class SOAPDispatcher(object):
 
-    def __init__(self, service, middlewares=None, hooks=None, wsdl=None, xsds=None, strict_soap_header=True):
+    def __init__(self, service, middlewares=None, hooks=None, wsdl=None, xsds=None, strict_soap_header=True,
+                 keep_xmlelement=True, parser_options=None, validation=None, operation_validation=None):
         """
         Args:
             service: the service to expose
@@ -35,9 +118,23 @@ class SOAPDispatcher(object):
             wsdl: an alternative wsdl to replace the one generated by soapfish
             strict_soap_header: if True an exception will be raised in a header part is not
                 in the schema
+            keep_xmlelement: if False the parsed request header and body objects do not
+                keep a reference to the request XML (see ComplexType.parse_xmlelement)
+            parser_options: options for the lxml parser of the requests, e.g.
+                {'huge_tree': True} (see soapfish.parsers.get_parser)
+            validation: the ValidationPolicy for all operations, by default
+                every request is validated
+            operation_validation: dict, the ValidationPolicy for some operations
+                (by operation name)
         """
         self.service = service
         self.middlewares = middlewares if middlewares is not None else []
+        self._middleware_chain = (None, None)
+        # Nothing is evaluated lazily while requests are handled (possibly by
+        # several threads at the same time), see: xsd.Schema.freeze().
+        self.service.version.SCHEMA.freeze()
+        for schema in self.service.schemas:
+            schema.freeze()
         self.schema_validator = py2xsd.schema_validator(self.service.schemas)
 
         if hooks is None:
@@ -63,117 +160,201 @@ class SOAPDispatcher(object):
         self.xsds = xsds
 
         self.strict_soap_header = strict_soap_header
+        self.keep_xmlelement = keep_xmlelement
+        self.parser_options = parser_options or {}
+        self.validation = validation if validation is not None else ValidationPolicy()
+        self.operation_validation = operation_validation or {}
+        self._build_routes()
+        self.middleware()
+
+    def middleware(self):
+        """
+        Return the middleware chain around the method call. It is composed
+        again only when self.middlewares changed.
 
-    def middleware(self, i=0):
-        if i == len(self.middlewares):
-            # at the end call the method
-            return call_method
-        return functools.partial(self.middlewares[i], next_call=self.middleware(i + 1))
+        Middlewares with an attribute `operations` (operation names) only wrap
+        the calls of these operations. They are called after the request was
+        parsed and the method was found (inside the other middlewares).
+        """
+        middlewares, chain = self._middleware_chain
+        if middlewares != tuple(self.middlewares):
+            middlewares = tuple(self.middlewares)
+            scoped = {}
+            for middleware in middlewares:
+                for operationName in getattr(middleware, 'operations', None) or ():
+                    scoped.setdefault(operationName, []).append(middleware)
+            operation_chains = {name: compose_middlewares(m, call_handler) for name, m in scoped.items()}
+            chain = compose_middlewares(
+                [m for m in middlewares if getattr(m, 'operations', None) is None],
+                functools.partial(call_method, operation_chains=operation_chains),
+            )
+            self._middleware_chain = (middlewares, chain)
+        return chain
 
     def _parse_soap_content(self, xml):
+        """
+        Parse the request and return the SOAP header element (or None) and the
+        first element in the SOAP body. The envelope is not parsed into
+        SOAP.Envelope objects, the body content is parsed by _parse_input().
+        """
         SOAP = self.service.version
         try:
             # note : no validation is performed
-            envelope = SOAP.Envelope.parsexml(xml)
+            envelope = parsers.fromstring(xml, **self.parser_options)
         except etree.XMLSyntaxError as e:
             raise SOAPError(SOAP.Code.CLIENT, '%s: %s' % (e.__class__.__name__, e))
-        # Actually this is more a stopgap measure than a real fix. The real
-        # fix is to change SOAP.Envelope/ComplexType so it raises some kind of
-        # validation error. A missing SOAP body is not allowed by the SOAP
-        # specs (according to my interpretation):
+        header = body = None
+        for child in envelope.iterchildren(tag=etree.Element):
+            name = etree.QName(child).localname
+            if name == 'Header' and header is None:
+                header = child
+            elif name == 'Body' and body is None:
+                body = child
+        # A missing SOAP body is not allowed by the SOAP specs (according to
+        # my interpretation):
         # SOAP 1.1: http://schemas.xmlsoap.org/soap/envelope/
         # SOAP 1.2: http://www.w3.org/2003/05/soap-envelope/
-        if envelope.Body is None:
+        if body is None:
             raise SOAPError(SOAP.Code.CLIENT, 'Missing SOAP body')
-        return envelope
+        content = next(body.iterchildren(tag=etree.Element), None)
+        if content is None:
+            raise SOAPError(SOAP.Code.CLIENT, 'Missing SOAP body content')
+        return header, content
+
+    def _build_routes(self):
+        '''
+        Maps the SOAP actions and the root tags of the requests (qualified and
+        local names of the input elements and of the elements in their
+        substitution groups) to the methods of the service. The first method
+        in service.methods wins if several methods match.
+        '''
+        self._methods_by_action = {}
+        self._methods_by_tag = {}
+        methods_by_input = {}
+        for method in self.service.methods:
+            self._methods_by_action.setdefault(method.soapAction, method)
+            if isinstance(method.input, six.string_types):
+                methods_by_input.setdefault(method.input, method)
+                self._add_route(method.input, self.service.find_element_by_name(method.input), method)
+        for schema in self.service.schemas:
+            for name, element in schema.elements.items():
+                if element.substitutionGroup is None:
+                    continue
+                # FIXME: Improve handling of namespaces to be less hacky...
+                method = methods_by_input.get(element.substitutionGroup.split(':')[-1])
+                if method is not None:
+                    self._add_route(name, element, method)
+
+    def _add_route(self, name, element, method):
+        if element is not None and element.namespace:
+            self._methods_by_tag.setdefault('{%s}%s' % (element.namespace, name), method)
+        self._methods_by_tag.setdefault(name, method)
 
     def _find_handler_for_request(self, request, body):
         # TODO: Properly handle invalid XML.
         SOAP = self.service.version
 
         action = SOAP.determine_soap_action(request)
-        root_tag = etree.QName(body.tag).localname
 
         if action:
             logger.debug('Finding handler using SOAP action found in HTTP headers: %s', action)
-            try:
-                return next(m for m in self.service.methods if m.soapAction == action)
-            except StopIteration:
+            method = self._methods_by_action.get(action)
+            if method is None:
                 raise SOAPError(SOAP.Code.CLIENT, 'Invalid SOAP action: %s' % action)
-
-        else:
-            logger.debug('Finding handler using root tag of the SOAP body: %s', root_tag)
-            try:
-                return next(m for m in self.service.methods if m.input == root_tag)
-            except StopIteration:
-                pass  # fall through and check for substitution group element
-            try:
-                # FIXME: Improve handling of namespaces to be less hacky...
-                e = next(e for s in self.service.schemas for n, e in s.elements.items() if n == root_tag)
-                return next(m for m in self.service.methods if m.input == e.substitutionGroup.split(':')[-1])
-            except StopIteration:
+            return method
+
+        logger.debug('Finding handler using root tag of the SOAP body: %s', body.tag)
+        method = self._methods_by_tag.get(body.tag)
+        if method is None:
+            root_tag = etree.QName(body.tag).localname
+            method = self._methods_by_tag.get(root_tag)
+            if method is None:
                 raise SOAPError(SOAP.Code.CLIENT, 'Missing SOAP action and invalid root tag: %s' % root_tag)
+        return method
 
-    def _parse_header(self, handler, soap_header):
+    def _parse_header(self, handler, soap_header, validated=True):
         # TODO return soap fault if header is required but missing in the input
         if soap_header is None:
             return None
+        # With a strict header the validation in _validate_header() succeeded.
+        options = {'keep_xmlelement': self.keep_xmlelement, 'trusted': validated and self.strict_soap_header}
         if handler.input_header:
-            return soap_header.parse_as(handler.input_header)
+            return handler.input_header.parse_xmlelement(soap_header, **options)
         elif self.service.input_header:
-            return soap_header.parse_as(self.service.input_header)
+            return self.service.input_header.parse_xmlelement(soap_header, **options)
 
-    def _parse_input(self, method, message):
+    def _parse_input(self, method, message, validated=True):
         input_parser = method.input
         if isinstance(method.input, six.string_types):
             element = self.service.find_element_by_name(method.input)
             input_parser = element._type
-        return input_parser.parse_xmlelement(message)
-
-    def _validate_response(self, return_object, tagname):
-        # XXX: Lookup of schema is untested as method not currently in use.
-        schema = return_object.SCHEMA
-        assert schema in self.service.schemas
-        return_object.xml(tagname, schema=schema,
-                          namespace=schema.targetNamespace,
-                          elementFormDefault=schema.elementFormDefault)
+        # A message validated in _validate_body() is not checked again.
+        return input_parser.parse_xmlelement(message, keep_xmlelement=self.keep_xmlelement, trusted=validated)
+
+    def _validation_policy(self, method):
+        return self.operation_validation.get(method.operationName, self.validation)
+
+    def _validate_request(self, policy, soap_header, soap_body):
+        """Validate the request if the policy says so, return True if it was validated."""
+        if not policy.should_validate(policy.requests):
+            policy.count('requests_skipped')
+            return False
+        policy.count('requests_validated')
+        try:
+            self._validate_input(soap_header, soap_body)
+        except (etree.DocumentInvalid, etree.XMLSyntaxError) as e:
+            policy.count('request_failures')
+            raise SOAPError(self.service.version.Code.CLIENT, '%s: %s' % (e.__class__.__name__, e))
+        return True
+
+    def _validate_response(self, policy, response):
+        """Validate the body of the rendered response if the policy says so, return an error or None."""
+        if not policy.should_validate(policy.responses):
+            policy.count('responses_skipped')
+            return None
+        policy.count('responses_validated')
+        SOAP = self.service.version
+        body = etree.fromstring(response.http_content).find('{%s}Body' % SOAP.ENVELOPE_NAMESPACE)
+        try:
+            for child in body:
+                self.schema_validator(child)
+        except (etree.DocumentInvalid, etree.XMLSyntaxError) as e:
+            policy.count('response_failures')
+            logger.error('Invalid response: %s: %s', e.__class__.__name__, e)
+            return SOAPError(SOAP.Code.SERVER, 'Invalid response: %s: %s' % (e.__class__.__name__, e))
+        return None
 
     def _validate_header(self, soap_header):
         if soap_header is None:
             return
-        for children in soap_header._xmlelement.getchildren():
-            namespace = children.nsmap.get(children.prefix)
-            if namespace == wsa.NAMESPACE:
-                wsa.XML_SCHEMA.assertValid(children)
+        for child in soap_header.iterchildren(tag=etree.Element):
+            if etree.QName(child).namespace == wsa.NAMESPACE:
+                wsa.XML_SCHEMA.assertValid(child)
             else:
                 try:
-                    self.schema_validator(children)
+                    self.schema_validator(child)
                 except (etree.DocumentInvalid, etree.XMLSyntaxError):
                     if self.strict_soap_header:
                         raise
 
     def _validate_body(self, soap_body):
-        self.schema_validator(soap_body.content())
+        self.schema_validator(soap_body)
 
-    def _validate_input(self, envelope):
-        self._validate_header(envelope.Header)
-        self._validate_body(envelope.Body)
+    def _validate_input(self, soap_header, soap_body):
+        self._validate_header(soap_header)
+        self._validate_body(soap_body)
 
     def _prepare_request(self, request):
-        SOAP = self.service.version
-
-        soap_envelope = self._parse_soap_content(request.http_content)
-        soap_header = soap_envelope.Header
-        soap_body = soap_envelope.Body.content()
-
+        soap_header, soap_body = self._parse_soap_content(request.http_content)
         try:
-            self._validate_input(soap_envelope)
-        except (etree.DocumentInvalid, etree.XMLSyntaxError) as e:
-            raise SOAPError(SOAP.Code.CLIENT, '%s: %s' % (e.__class__.__name__, e))
-
-        request.method = self._find_handler_for_request(request, soap_body)
-        request.soap_header = self._parse_header(request.method, soap_header)
-        request.soap_body = self._parse_input(request.method, soap_body)
+            request.method = self._find_handler_for_request(request, soap_body)
+        except SOAPError:
+            # Invalid requests are reported as such even if they can't be routed.
+            self._validate_request(self.validation, soap_header, soap_body)
+            raise
+        validated = self._validate_request(self._validation_policy(request.method), soap_header, soap_body)
+        request.soap_header = self._parse_header(request.method, soap_header, validated)
+        request.soap_body = self._parse_input(request.method, soap_body, validated)
 
     def dispatch(self, request):
         request_method = request.environ.get('REQUEST_METHOD', '')
@@ -209,14 +390,16 @@ class SOAPDispatcher(object):
             response.http_content = SOAP.get_error_response(error.code, error.message, header=response.soap_header)
             response.http_status_code = 500
         else:
-            tagname = uncapitalize(response.soap_body.__class__.__name__)
-            # self._validate_response(response.soap_body, tagname)
-            # TODO: handle validation results
             if isinstance(request.method.output, six.string_types):
                 tagname = request.method.output
             else:
                 tagname = uncapitalize(response.content.__class__.__name__)
             response.http_content = SOAP.Envelope.response(tagname, response.soap_body, header=response.soap_header)
+            error = self._validate_response(self._validation_policy(request.method), response)
+            if error is not None:
+                response.http_content = SOAP.get_error_response(error.code, error.message,
+                                                                header=response.soap_header)
+                response.http_status_code = 500
 
         return self._call_hook('soap-response', dispatcher=self, request=request, response=response)
 
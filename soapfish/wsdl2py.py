@@ -12,6 +12,7 @@ from collections import deque
 import six
 from lxml import etree
 
+from .lazy import make_lazy
 from .soap import SOAPVersion
 from .utils import (
     find_xsd_namespaces,
@@ -79,7 +80,7 @@ def merge_imports(wsdl, definitions, xsd_namespaces, cwd=None, seen=None):
         definitions.portTypes = deduplicate(imported.portTypes + definitions.portTypes)
 
 
-def generate_code_from_wsdl(xml, target, use_wsa=False, encoding='utf8', cwd=None):
+def generate_code_from_wsdl(xml, target, use_wsa=False, encoding='utf8', cwd=None, lazy=False):
 
     if isinstance(xml, six.binary_type):
         xml = etree.fromstring(xml)
@@ -110,6 +111,8 @@ def generate_code_from_wsdl(xml, target, use_wsa=False, encoding='utf8', cwd=Non
         is_server=bool(target == 'server'),
         use_wsa=use_wsa,
     )
+    if lazy:
+        code = make_lazy(code)
 
     return code.encode(encoding) if encoding else code
 
@@ -132,6 +135,8 @@ def main(argv=None):
                        action='store_const', const='server', dest='target')
     parser.add_argument('-w', '--use-wsa', help='Use web services addressing.',
                         action='store_true')
+    parser.add_argument('-l', '--lazy', help='Define the types on first use (requires Python 3.7).',
+                        action='store_true')
     parser.add_argument('wsdl', help='Input path to a WSDL document.')
     parser.add_argument('output', help='Output path for Python code.', nargs='?',
                         type=argparse.FileType('wb'), default=stdout)
@@ -141,7 +146,7 @@ def main(argv=None):
     xml = stdin.read() if opt.wsdl == '-' else open_document(opt.wsdl)
     cwd = opt.wsdl if '://' in opt.wsdl else os.path.abspath(opt.wsdl)
     cwd = os.path.dirname(cwd)
-    code = generate_code_from_wsdl(xml, opt.target, opt.use_wsa, cwd=cwd)
+    code = generate_code_from_wsdl(xml, opt.target, opt.use_wsa, cwd=cwd, lazy=opt.lazy)
 
     opt.output.write(code.strip())
 
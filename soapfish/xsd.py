@@ -46,24 +46,27 @@ import functools
 import itertools
 import logging
 import re
+import threading
+import types
 from copy import copy
 from datetime import datetime, time
 from decimal import Decimal as _Decimal
 from importlib import import_module
 
-import iso8601
 import six
 from lxml import etree
 
-from . import namespaces as ns
-from .utils import timezone_offset_to_string
+from . import datetime_codec, namespaces as ns, parsers
 from .xsd_types import XSDDate
 
 
 logger = logging.getLogger(__name__)
 
 NIL = object()
+XSI_NIL = '{%s}nil' % ns.xsi
 UNBOUNDED = _Decimal('infinity')
+WHITESPACE = re.compile(r'[\t\r\n\s]')
+WHITESPACES = re.compile(r'[\t\r\n\s]+')
 
 
 class CallStyle(object):
@@ -105,18 +108,30 @@ class All(Indicator):
     pass
 
 
+def _lookup_set(values):
+    '''
+    Returns a frozenset for fast membership tests of the values (or the values
+    themselves if they are not hashable).
+    '''
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
 class Type(object):
     '''
     Abstract.
     '''
+    __slots__ = ()
 
     def accept(self, value):
         raise NotImplementedError
 
-    def parse_xmlelement(self, xmlelement):
+    def parse_xmlelement(self, xmlelement, **options):
         raise NotImplementedError
 
-    def parsexml(self, xml):
+    def parsexml(self, xml, **options):
         raise NotImplementedError
 
     def render(self, parent, value):
@@ -131,8 +146,8 @@ class SimpleType(Type):
     def render(self, parent, value, namespace, elementFormDefault):
         parent.text = self.xmlvalue(value)
 
-    def parse_xmlelement(self, xmlelement):
-        return self.pythonvalue(xmlelement.text)
+    def parse_xmlelement(self, xmlelement, **options):
+        return self._pythonvalue(xmlelement.text)
 
     def xmlvalue(self, value):
         raise NotImplementedError
@@ -140,6 +155,19 @@ class SimpleType(Type):
     def pythonvalue(self, xmlvalue):
         raise NotImplementedError
 
+    def _pythonvalue(self, xmlvalue):
+        '''
+        pythonvalue() for the parsers which may skip checking the facets: they
+        call accept() when assigning the value unless it is trusted.
+        '''
+        return self.pythonvalue(xmlvalue)
+
+    def _precompile(self):
+        '''
+        Does the work otherwise done lazily on first use, see: Schema.freeze().
+        '''
+        pass
+
 
 class String(SimpleType):
 
@@ -174,36 +202,59 @@ class String(SimpleType):
         if not isinstance(value, six.string_types):
             raise ValueError("Value %r for class '%s'." % (value, self.__class__.__name__))
 
-        value = self._clean_whitespace(value)
+        return self._check_facets(value)
 
-        if self.pattern:
-            pattern = self.pattern + '$'
-            if re.match(pattern, value) is None:
-                raise ValueError("Value '%s' doesn't match pattern '%s'" % (value, self.pattern))
+    def _check_facets(self, value):
+        # Replaced by the compiled facets of this instance on first use.
+        self._check_facets = self._compile_facets()
+        return self._check_facets(value)
 
-        if self.enumeration:
-            if not (value in self.enumeration):
-                raise ValueError("Value '%s' not in list %s." % (value, self.enumeration))
+    def _precompile(self):
+        self._check_facets = self._compile_facets()
 
-        if self.length:
-            if len(value) != self.length:
-                raise ValueError("Value '%s' length %s expected." % (value, self.length))
+    def _compile_facets(self):
+        '''
+        Returns a function which normalizes the whitespace of a string and
+        checks the other facets. Facets must not be changed after first use.
+        '''
+        clean_whitespace = self._clean_whitespace if self.whiteSpace in ('replace', 'collapse') else None
+        pattern = self.pattern
+        match = re.compile(pattern + '$').match if pattern else None
+        enumeration = self.enumeration
+        values = _lookup_set(enumeration) if enumeration else None
+        length = self.length
+        minLength = self.minLength
+        maxLength = self.maxLength
 
-        if self.minLength:
-            if len(value) < self.minLength:
-                raise ValueError("Value '%s' minLength %s expected." % (value, self.minLength))
+        def check_facets(value):
+            if clean_whitespace is not None:
+                value = clean_whitespace(value)
 
-        if self.maxLength:
-            if len(value) > self.maxLength:
-                raise ValueError("Value '%s' maxLength %s expected." % (value, self.maxLength))
+            if match is not None and match(value) is None:
+                raise ValueError("Value '%s' doesn't match pattern '%s'" % (value, pattern))
 
-        return value
+            if values is not None and value not in values:
+                raise ValueError("Value '%s' not in list %s." % (value, enumeration))
+
+            if length and len(value) != length:
+                raise ValueError("Value '%s' length %s expected." % (value, length))
+
+            if minLength and len(value) < minLength:
+                raise ValueError("Value '%s' minLength %s expected." % (value, minLength))
+
+            if maxLength and len(value) > maxLength:
+                raise ValueError("Value '%s' maxLength %s expected." % (value, maxLength))
+
+            return value
+        return check_facets
 
     def xmlvalue(self, value):
         return value
 
     def pythonvalue(self, xmlvalue):
-        return xmlvalue
+        if xmlvalue is None or not self.whiteSpace:
+            return xmlvalue
+        return self._clean_whitespace(xmlvalue)
 
     def _clean_whitespace(self, value):
         if self.whiteSpace == 'preserve':
@@ -211,10 +262,10 @@ class String(SimpleType):
             pass
         elif self.whiteSpace == 'replace':
             # replace line feeds, tabs, spaces, and carriage returns with whitespaces
-            value = re.sub(r'[\t\r\n\s]', ' ', value)
+            value = WHITESPACE.sub(' ', value)
         elif self.whiteSpace == 'collapse':
             # clean line feeds, tabs, spaces, and carriage returns with one whitespace
-            value = re.sub(r'[\t\r\n\s]+', ' ', value)
+            value = WHITESPACES.sub(' ', value)
 
         return value
 
@@ -257,19 +308,7 @@ class Date(SimpleType):
          3.2.9.2 Constraining facets
     '''
 
-    YEAR_MONTH_DAY_REGEX = re.compile(r'''
-        ^(\-)?
-        (?P<year>\d{4,})\-(?P<month>\d{2})\-(?P<day>\d{2})
-        (?P<timezone>
-                Z
-                |
-                (
-                    (?P<tz_sign>[-+])
-                    (?P<tz_hour>[0-9]{2})
-                    :{0,1}
-                    (?P<tz_minute>[0-9]{2}){0,1}
-                )
-            )?$''', re.VERBOSE)
+    YEAR_MONTH_DAY_REGEX = datetime_codec.DATE_REGEX
 
     def accept(self, value):
         if value is None:
@@ -284,41 +323,16 @@ class Date(SimpleType):
         raise ValueError('Incorrect type value %r for date field.' % value)
 
     def xmlvalue(self, value):
-        timestring_without_tz = value.strftime('%Y-%m-%d')
-        tz = getattr(value, 'tzinfo', None)
-        if not tz:
-            return timestring_without_tz
-        utc_offset = tz.utcoffset(None)
-        formatted_tz = timezone_offset_to_string(utc_offset)
-        return timestring_without_tz + formatted_tz
+        return datetime_codec.format_date(value)
 
     def pythonvalue(self, value):
         if (value is None) or (value == 'nil'):
             return None
         if not isinstance(value, six.string_types):
             raise ValueError('Expected a string, not %r' % value)
-
-        match = self.YEAR_MONTH_DAY_REGEX.match(value)
-        if match is None:
-            raise ValueError('Unable to parse date string %r' % value)
-        year = int(match.group('year'))
-        month = int(match.group('month'))
-        day = int(match.group('day'))
-        tz = self._parse_tz(match)
+        year, month, day, tz = datetime_codec.parse_date(value)
         return XSDDate(year, month, day, tzinfo=tz)
 
-    def _parse_tz(self, match):
-        offset_string = match.group('timezone')
-        if not offset_string:
-            return None
-        elif offset_string == 'Z':
-            return iso8601.UTC
-
-        sign = 1 if (match.group('tz_sign') == '+') else -1
-        offset_hours = sign * int(match.group('tz_hour'))
-        offset_minutes = sign * int(match.group('tz_minute'))
-        return iso8601.FixedOffset(offset_hours, offset_minutes, name='UTC' + offset_string)
-
 
 class DateTime(SimpleType):
     '''
@@ -331,26 +345,20 @@ class DateTime(SimpleType):
         elif isinstance(value, datetime):
             return value
         elif isinstance(value, six.string_types):
-            return iso8601.parse_date(value)
+            return datetime_codec.parse_datetime(value)
         raise ValueError("Incorrect type value '%s' for DateTime field." % value)
 
     def xmlvalue(self, value):
         if value is None:
             return 'nil'
         else:
-            timestring_without_tz = value.strftime('%Y-%m-%dT%H:%M:%S')
-            tz = value.tzinfo
-            if not tz:
-                return timestring_without_tz
-            utc_offset = tz.utcoffset(value)
-            formatted_tz = timezone_offset_to_string(utc_offset)
-            return timestring_without_tz + formatted_tz
+            return datetime_codec.format_datetime(value)
 
     def pythonvalue(self, value):
         if value is None or value == 'nil':
             return None
         else:
-            return iso8601.parse_date(value)
+            return datetime_codec.parse_datetime(value)
 
 
 class Time(SimpleType):
@@ -364,39 +372,24 @@ class Time(SimpleType):
         elif isinstance(value, time):
             return value
         elif isinstance(value, six.string_types):
-            return self._parse(value)
+            return datetime_codec.parse_time(value)
         raise ValueError("Incorrect type value '%s' for Time field." % value)
 
     def xmlvalue(self, value):
         if value is None:
             return 'nil'
         else:
-            timestring_without_tz = value.strftime('%H:%M:%S')
-            tz = value.tzinfo
-            if not tz:
-                return timestring_without_tz
-            utc_offset = tz.utcoffset(None)
-            formatted_tz = timezone_offset_to_string(utc_offset)
-            return timestring_without_tz + formatted_tz
+            return datetime_codec.format_time(value)
 
     def pythonvalue(self, value):
         if value is None or value == 'nil':
             return None
         else:
-            return self._parse(value)
-
-    @staticmethod
-    def _parse(value):
-        # Horrible hacky approach to implement this quickly:
-        try:
-            dt = iso8601.parse_date('1900-01-01T' + value)
-        except Exception as e:
-            raise ValueError(e)
-        else:
-            return dt.time().replace(tzinfo=dt.tzinfo)
+            return datetime_codec.parse_time(value)
 
 
 class Decimal(SimpleType):
+    _from_text = float  # conversion of parsed text, see: _pythonvalue()
 
     def __init__(self, enumeration=None, fractionDigits=None, maxExclusive=None,
                  maxInclusive=None, minExclusive=None, minInclusive=None,
@@ -411,44 +404,75 @@ class Decimal(SimpleType):
         self.totalDigits = totalDigits
 
     def _check_restrictions(self, value):
-        if self.enumeration is not None and value not in self.enumeration:
-            raise ValueError('%s not in enumeration %s' % (value, self.enumeration))
-
-        if self.fractionDigits is not None:
-            strvalue = str(value)
-            if self.fractionDigits == 0:
-                if '.' in strvalue:
-                    raise ValueError('Wrong fraction digits for value %s allowed %s' % (strvalue, self.fractionDigits))
-            else:
-                if '.' not in strvalue:
-                    raise ValueError('Wrong fraction digits for value %s allowed %s' % (strvalue, self.fractionDigits))
-                fr = strvalue.split('.')[1]
-                if len(fr) != self.fractionDigits:
-                    raise ValueError('Wrong fraction digits for value %s allowed %s' % (strvalue, self.fractionDigits))
-
-        if self.maxExclusive is not None and value >= self.maxExclusive:
-            raise ValueError('Value %s greater or equal to maxExclusive %s' % (value, self.maxExclusive))
-        if self.maxInclusive is not None and value > self.maxInclusive:
-            raise ValueError('Value %s greater than maxInclusive %s' % (value, self.maxInclusive))
-        if self.minExclusive is not None and value <= self.minExclusive:
-            raise ValueError('Value %s smaller or equal to minExclusive %s' % (value, self.minExclusive))
-        if self.minInclusive is not None and value < self.minInclusive:
-            raise ValueError('Value %s smaller than minInclusive %s' % (value, self.minInclusive))
-
-        if self.pattern is not None:
-            pattern = self.pattern + '$'
-            if re.match(pattern, str(value)) is None:
-                raise ValueError('Value %s doesn\'t match pattern %s.' % (value, self.pattern))
-
-        if self.totalDigits is not None:
-            strvalue = str(value)
-            l = len(strvalue)
-            if '.' in strvalue:
-                l = l - 1
-            if l > self.totalDigits:
-                raise ValueError('Number of total digits of %s is bigger than %s.' % (strvalue, self.totalDigits))
+        # Replaced by the compiled facets of this instance on first use.
+        self._check_restrictions = self._compile_restrictions()
+        return self._check_restrictions(value)
 
-        return value
+    def _precompile(self):
+        self._check_restrictions = self._compile_restrictions()
+
+    def _compile_restrictions(self):
+        '''
+        Returns a function which checks a value against the facets. Digits of
+        integers are checked numerically, other values by their string
+        representation. Facets must not be changed after first use.
+        '''
+        enumeration = self.enumeration
+        values = _lookup_set(enumeration) if enumeration is not None else None
+        fractionDigits = self.fractionDigits
+        maxExclusive = self.maxExclusive
+        maxInclusive = self.maxInclusive
+        minExclusive = self.minExclusive
+        minInclusive = self.minInclusive
+        pattern = self.pattern
+        match = re.compile(pattern + '$').match if pattern is not None else None
+        # The string of every integer matches the default pattern of xsd.Integer.
+        match_integer = match if pattern != Integer.overrides['pattern'] else None
+        totalDigits = self.totalDigits
+        if totalDigits is not None:
+            # The sign of negative numbers counts as a digit.
+            integer_range = (-10 ** (totalDigits - 1), 10 ** totalDigits)
+
+        def check_restrictions(value):
+            if values is not None and value not in values:
+                raise ValueError('%s not in enumeration %s' % (value, enumeration))
+
+            is_integer = type(value) in six.integer_types
+            if fractionDigits is not None:
+                if is_integer:
+                    valid = not fractionDigits
+                else:
+                    strvalue = str(value)
+                    if fractionDigits == 0:
+                        valid = '.' not in strvalue
+                    else:
+                        valid = '.' in strvalue and len(strvalue.split('.')[1]) == fractionDigits
+                if not valid:
+                    raise ValueError('Wrong fraction digits for value %s allowed %s' % (value, fractionDigits))
+
+            if maxExclusive is not None and value >= maxExclusive:
+                raise ValueError('Value %s greater or equal to maxExclusive %s' % (value, maxExclusive))
+            if maxInclusive is not None and value > maxInclusive:
+                raise ValueError('Value %s greater than maxInclusive %s' % (value, maxInclusive))
+            if minExclusive is not None and value <= minExclusive:
+                raise ValueError('Value %s smaller or equal to minExclusive %s' % (value, minExclusive))
+            if minInclusive is not None and value < minInclusive:
+                raise ValueError('Value %s smaller than minInclusive %s' % (value, minInclusive))
+
+            if match is not None and (not is_integer or match_integer is not None) and match(str(value)) is None:
+                raise ValueError('Value %s doesn\'t match pattern %s.' % (value, pattern))
+
+            if totalDigits is not None:
+                if is_integer:
+                    valid = integer_range[0] < value < integer_range[1]
+                else:
+                    strvalue = str(value)
+                    valid = len(strvalue) - ('.' in strvalue) <= totalDigits
+                if not valid:
+                    raise ValueError('Number of total digits of %s is bigger than %s.' % (value, totalDigits))
+
+            return value
+        return check_restrictions
 
     def accept(self, value):
         if value is None:
@@ -474,6 +498,13 @@ class Decimal(SimpleType):
         else:
             return self.accept(xmlvalue)
 
+    def _pythonvalue(self, xmlvalue):
+        if six.get_unbound_function(type(self).pythonvalue) is not six.get_unbound_function(Decimal.pythonvalue):
+            return self.pythonvalue(xmlvalue)  # overridden by a subclass
+        if xmlvalue is None or xmlvalue == 'nil':
+            return None
+        return self._from_text(xmlvalue)
+
 
 class Double(Decimal):
 
@@ -496,6 +527,7 @@ class Float(Decimal):
 
 
 class Integer(Decimal):
+    _from_text = long if six.PY2 else int  # noqa: F821
 
     overrides = {'fractionDigits': 0, 'pattern': r'[-+]?[0-9]+'}
 
@@ -503,10 +535,23 @@ class Integer(Decimal):
                  maxExclusive=None, maxInclusive=None, minExclusive=None,
                  minInclusive=None, pattern=None, totalDigits=None):
         facets = {k: v for k, v in locals().items() if k not in {'self', '__class__'}}
-        for c in itertools.dropwhile(lambda x: x != Integer, reversed(self.__class__.__mro__)):
-            facets.update(c.overrides)
+        facets.update(self._merged_overrides())
         super(Integer, self).__init__(**facets)
 
+    @classmethod
+    def _merged_overrides(cls):
+        '''
+        Returns the overrides of this class and its base classes (up to
+        Integer), merged once per class.
+        '''
+        merged = cls.__dict__.get('_overrides')
+        if merged is None:
+            merged = {}
+            for c in itertools.dropwhile(lambda x: x != Integer, reversed(cls.__mro__)):
+                merged.update(c.overrides)
+            cls._overrides = merged
+        return merged
+
     def accept(self, value):
         if value is None:
             return None
@@ -601,12 +646,49 @@ class MaxOccurs(SimpleType):
         return self.accept(xmlvalue)
 
 
+def _append_element(parent, tagname):
+    xmlelement = etree.Element(tagname)
+    parent.append(xmlelement)
+    return xmlelement
+
+
+def _element_factory(tagname):
+    '''
+    Returns a callable(parent, tagname) creating a new child element.
+    etree.SubElement is faster but for qualified tags it picks namespace
+    prefixes from the parent's scope, so these are still created standalone
+    and appended to keep the generated prefixes (and thus the output) stable.
+    '''
+    if tagname.startswith('{'):
+        return _append_element
+    return etree.SubElement
+
+
+def _set_parsed_value(instance, field_name, value, options):
+    if options.get('trusted'):
+        # No need to validate the value again, see: ComplexType.parse_xmlelement.
+        object.__setattr__(instance, field_name, value)
+    else:
+        setattr(instance, field_name, value)
+
+
+_evaluate_type_lock = threading.Lock()
+
+
 def import_type(type_name):
+    '''
+    Imports a type by its full path, 'module.Type()' returns an instance of
+    the type (e.g. for elements with an anonymous type).
+    '''
+    instance = type_name.endswith('()')
+    if instance:
+        type_name = type_name[:-2]
     if '.' not in type_name:
         raise ValueError('We need the full namepath to be able to import it: %s' % type_name)
     module, name = type_name.rsplit('.', 1)
     module = import_module(module)
-    return getattr(module, name)
+    _type = getattr(module, name)
+    return _type() if instance else _type
 
 
 class Element(object):
@@ -646,13 +728,24 @@ class Element(object):
         self.substitutionGroup = substitutionGroup
 
     def _evaluate_type(self):
-        if self._type is None:
-            if isinstance(self._passed_type, six.string_types):
-                self._passed_type = import_type(self._passed_type)
-            if isinstance(self._passed_type, Type):
-                self._type = self._passed_type
-            else:
-                self._type = self._passed_type()
+        if self._type is not None:
+            return
+        passed_type = self._passed_type
+        if isinstance(passed_type, six.string_types):
+            passed_type = import_type(passed_type)
+        _type = passed_type if isinstance(passed_type, Type) else passed_type()
+        # Another thread might have evaluated the type in the meantime, all
+        # threads must use the same instance.
+        with _evaluate_type_lock:
+            if self._type is None:
+                self._passed_type = passed_type
+                self._type = _type
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        # The instance has no value for this field, see: ComplexType.__getattr__.
+        return instance.__getattr__(self._name)
 
     def empty_value(self):
         '''
@@ -669,7 +762,8 @@ class Element(object):
         '''
         Checks is the value correct from type defined in constructions.
         '''
-        self._evaluate_type()
+        if self._type is None:
+            self._evaluate_type()
         if value == NIL:
             if self.nillable:
                 return NIL
@@ -679,7 +773,8 @@ class Element(object):
             return self._type.accept(value)
 
     def render(self, parent, field_name, value, namespace=None, elementFormDefault=None):
-        self._evaluate_type()
+        if self._type is None:
+            self._evaluate_type()
         if value is None:
             return
 
@@ -695,13 +790,45 @@ class Element(object):
             self._type.render(xmlelement, value, namespace, elementFormDefault)
         parent.append(xmlelement)
 
-    def parse(self, instance, field_name, xmlelement):
+    def _render_plan(self, field_name, namespace=None, elementFormDefault=None):
+        '''
+        Returns a callable(parent, value) which does the same as render() for
+        the given field name, namespace and elementFormDefault. The tag name is
+        computed only once so the callable can be cached by the ComplexType.
+        '''
         self._evaluate_type()
+        namespace, field_name = self._qualified_tag(field_name, namespace, elementFormDefault)
+        render_type = self._type.render
+        new_element = _element_factory(field_name)
+
+        def render(parent, value):
+            if value is None:
+                return
+            xmlelement = new_element(parent, field_name)
+            if value is NIL:
+                xmlelement.set(XSI_NIL, 'true')
+            else:
+                render_type(xmlelement, value, namespace, elementFormDefault)
+        return render
+
+    def _qualified_tag(self, tagname, namespace=None, elementFormDefault=None):
+        '''
+        Returns the namespace for the content of this element and its tag.
+        '''
+        if self.namespace is not None:
+            namespace = self.namespace
+        if namespace is not None and elementFormDefault == ElementFormDefault.QUALIFIED:
+            tagname = '{%s}%s' % (namespace, tagname)
+        return namespace, tagname
+
+    def parse(self, instance, field_name, xmlelement, **options):
+        if self._type is None:
+            self._evaluate_type()
         if xmlelement.get('{%s}nil' % ns.xsi) == 'true':
             value = NIL
         else:
-            value = self._type.parse_xmlelement(xmlelement)
-        setattr(instance, field_name, value)
+            value = self._type.parse_xmlelement(xmlelement, **options)
+        _set_parsed_value(instance, field_name, value, options)
 
     def __repr__(self):
         if isinstance(self._type, six.string_types):
@@ -757,7 +884,8 @@ class Attribute(Element):
         self.default = default
 
     def render(self, parent, field_name, value, namespace=None, elementFormDefault=None):
-        self._evaluate_type()
+        if self._type is None:
+            self._evaluate_type()
         if value is None:
             if self._minOccurs:
                 raise ValueError('Value None is not acceptable for required field.')
@@ -772,13 +900,34 @@ class Attribute(Element):
             xmlvalue = self._type.xmlvalue(value)
         parent.set(field_name, xmlvalue)
 
-    def parse(self, instance, field_name, xmlelement):
+    def _render_plan(self, field_name, namespace=None, elementFormDefault=None):
         self._evaluate_type()
+        required = self._minOccurs
+        nillable = self.nillable
+        to_xmlvalue = self._type.xmlvalue
+
+        def render(parent, value):
+            if value is None:
+                if required:
+                    raise ValueError('Value None is not acceptable for required field.')
+                return
+            elif value is NIL:
+                if not nillable:
+                    raise ValueError('Nil value for not nillable Attribute.')
+                xmlvalue = 'nil'
+            else:
+                xmlvalue = to_xmlvalue(value)
+            parent.set(field_name, xmlvalue)
+        return render
+
+    def parse(self, instance, field_name, xmlelement, **options):
+        if self._type is None:
+            self._evaluate_type()
         xmlvalue = xmlelement.get(field_name)
         if xmlvalue is None:
             xmlvalue = self.default
-        value = self._type.pythonvalue(xmlvalue)
-        setattr(instance, field_name, value)
+        value = self._type._pythonvalue(xmlvalue)
+        _set_parsed_value(instance, field_name, value, options)
 
 
 class Ref(Element):
@@ -810,6 +959,21 @@ class Ref(Element):
         self._evaluate_type()
         return copy(self._type)
 
+    def parse(self, instance, field_name, xmlelement, children=None, **options):
+        '''
+        The referenced fields live directly in xmlelement, children are the
+        sub-elements of xmlelement which belong to the referenced type (all
+        sub-elements if not specified).
+        '''
+        if self._type is None:
+            self._evaluate_type()
+        if not isinstance(self._type, ComplexType):
+            return super(Ref, self).parse(instance, field_name, xmlelement, **options)
+        if children is None:
+            children = xmlelement
+        value = self._type._parse_children(xmlelement, children, **options)
+        _set_parsed_value(instance, field_name, value, options)
+
     def render(self, parent, field_name, value, namespace=None, elementFormDefault=None):
         if value is None:
             if self._required:
@@ -840,12 +1004,21 @@ class Content(Ref):
 
 
 class TypedList(list):
-    def __init__(self, element):
+    '''
+    The list value of a ListElement field, validates the items like setting a
+    field does. extend() (and TypedList(element, values)) validate a batch of
+    items at once: either all items are added or none.
+    '''
+
+    def __init__(self, element, values=None):
         super(TypedList, self).__init__()
         self._list = element
+        if values is not None:
+            self.extend(values)
 
     def append(self, value):
-        self._list._evaluate_type()
+        if self._list._type is None:
+            self._list._evaluate_type()
         if value == NIL:
             if not self._list.nillable:
                 raise ValueError('Nil value in not nillable list.')
@@ -856,6 +1029,32 @@ class TypedList(list):
             raise ValueError('You must not add more than %s items to this list.' % self._list._maxOccurs)
         super(TypedList, self).append(accepted_value)
 
+    def extend(self, values):
+        element = self._list
+        if element._type is None:
+            element._evaluate_type()
+        accept = element._type.accept
+        nillable = element.nillable
+        accepted_values = []
+        for value in values:
+            if value == NIL:
+                if not nillable:
+                    raise ValueError('Nil value in not nillable list.')
+                accepted_values.append(NIL)
+            else:
+                accepted_values.append(accept(value))
+        if element._maxOccurs is not None and (len(self) + len(accepted_values) > element._maxOccurs):
+            raise ValueError('You must not add more than %s items to this list.' % element._maxOccurs)
+        super(TypedList, self).extend(accepted_values)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __reduce__(self):
+        # the items must be added after the element is known
+        return (self.__class__, (self._list, list(self)))
+
 
 class ListElement(Element):
     '''
@@ -887,7 +1086,8 @@ class ListElement(Element):
         return TypedList(self)
 
     def render(self, parent, field_name, value, namespace=None, elementFormDefault=None):
-        self._evaluate_type()
+        if self._type is None:
+            self._evaluate_type()
         items = value  # The value must be list of items.
         if self._minOccurs and len(items) < self._minOccurs:
             raise ValueError('For %s minOccurs=%d but list length %d.' % (field_name, self._minOccurs, len(items)))
@@ -909,51 +1109,321 @@ class ListElement(Element):
                 self._type.render(xmlelement, item, namespace, elementFormDefault)
             parent.append(xmlelement)
 
-    def parse(self, instance, field_name, xmlelement):
+    def _render_plan(self, field_name, namespace=None, elementFormDefault=None):
         self._evaluate_type()
-        if xmlelement.get('{%s}nil' % ns.xsi):
-            value = NIL
+        minOccurs = self._minOccurs
+        maxOccurs = self._maxOccurs
+        namespace, tagname = self._qualified_tag(self.tagname, namespace, elementFormDefault)
+        render_type = self._type.render
+        new_element = _element_factory(tagname)
+
+        def render(parent, items):
+            if minOccurs and len(items) < minOccurs:
+                raise ValueError('For %s minOccurs=%d but list length %d.' % (field_name, minOccurs, len(items)))
+            if maxOccurs and len(items) > maxOccurs:
+                raise ValueError('For %s maxOccurs=%d but list length %d.' % (field_name, maxOccurs, len(items)))
+            for item in items:
+                xmlelement = new_element(parent, tagname)
+                if item is NIL:
+                    xmlelement.set(XSI_NIL, 'true')
+                else:
+                    render_type(xmlelement, item, namespace, elementFormDefault)
+        return render
+
+    def _write(self, xf, field_name, items, namespace=None, elementFormDefault=None):
+        '''
+        Streaming counterpart of render() (see: ComplexType.write_xml), items
+        can be any iterable. Yields after every item written.
+        '''
+        self._evaluate_type()
+        namespace, tagname = self._qualified_tag(self.tagname, namespace, elementFormDefault)
+        count = 0
+        for item in items:
+            count += 1
+            if self._maxOccurs and count > self._maxOccurs:
+                raise ValueError('For %s maxOccurs=%d but list is longer.' % (field_name, self._maxOccurs))
+            if item is not NIL and isinstance(self._type, ComplexType):
+                for _ in self._type._write(xf, tagname, item, namespace, elementFormDefault):
+                    yield
+            else:
+                xmlelement = etree.Element(tagname)
+                if item is NIL:
+                    xmlelement.set(XSI_NIL, 'true')
+                else:
+                    self._type.render(xmlelement, item, namespace, elementFormDefault)
+                _write_xmlelement(xf, xmlelement)
+            yield
+        if self._minOccurs and count < self._minOccurs:
+            raise ValueError('For %s minOccurs=%d but list length %d.' % (field_name, self._minOccurs, count))
+
+    def parse(self, instance, field_name, xmlelement, **options):
+        _list = getattr(instance, field_name)
+        if options.get('trusted'):
+            list.append(_list, self.parse_item(xmlelement, **options))
         else:
-            value = self._type.parse_xmlelement(xmlelement)
+            _list.append(self.parse_item(xmlelement, **options))
+
+    def parse_many(self, instance, field_name, xmlelements, **options):
+        '''
+        Parses the elements of all items at once and adds them to the list
+        with a single (batch validated) extend().
+        '''
+        if self._type is None:
+            self._evaluate_type()
         _list = getattr(instance, field_name)
-        _list.append(value)
+        parse = self._type.parse_xmlelement
+        items = [NIL if xmlelement.get(XSI_NIL) else parse(xmlelement, **options) for xmlelement in xmlelements]
+        if options.get('trusted'):
+            list.extend(_list, items)
+        else:
+            _list.extend(items)
+
+    def parse_item(self, xmlelement, **options):
+        if self._type is None:
+            self._evaluate_type()
+        if xmlelement.get(XSI_NIL):
+            return NIL
+        return self._type.parse_xmlelement(xmlelement, **options)
+
+
+def _field_renderer(field, field_name, namespace, elementFormDefault):
+    '''
+    Returns the precompiled renderer of a field. Fields which override render()
+    without providing a matching _render_plan() fall back to render().
+    '''
+    mro = type(field).__mro__
+    plan_owner = next(c for c in mro if '_render_plan' in vars(c))
+    render_owner = next(c for c in mro if 'render' in vars(c))
+    if issubclass(plan_owner, render_owner):
+        return field._render_plan(field_name, namespace, elementFormDefault)
+    return lambda parent, value: field.render(parent, field_name, value, namespace, elementFormDefault)
+
+
+def _parses_in_bulk(field):
+    '''
+    Returns True if the items of the ListElement field can be parsed with
+    parse_many(), fields which override parse() without providing a matching
+    parse_many() are parsed item by item.
+    '''
+    cls = type(field)
+    try:
+        return _bulk_parsing[cls]
+    except KeyError:
+        pass
+    bulk_owner = next(c for c in cls.__mro__ if 'parse_many' in vars(c))
+    parse_owner = next(c for c in cls.__mro__ if 'parse' in vars(c))
+    _bulk_parsing[cls] = issubclass(bulk_owner, parse_owner)
+    return _bulk_parsing[cls]
+
+
+_bulk_parsing = {}  # ListElement class -> result of _parses_in_bulk()
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def _values_equal(value, other):
+    if isinstance(value, (list, tuple)) and isinstance(other, (list, tuple)):
+        # frozen instances store tuples instead of lists
+        return len(value) == len(other) and all(_values_equal(a, b) for a, b in zip(value, other))
+    return value == other
+
+
+def _sort_key(value):
+    '''
+    Returns a key for ordering field values: None < NIL < lists < values.
+    '''
+    if value is None:
+        return (0, )
+    elif value is NIL:
+        return (1, )
+    elif isinstance(value, (list, tuple)):
+        return (2, tuple(_sort_key(item) for item in value))
+    return (3, value)
+
+
+def _freeze(value):
+    if isinstance(value, ComplexType):
+        return value.freeze()
+    elif isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 
 class ComplexTypeMetaInfo(object):
 
-    def __init__(self, cls):
+    def __init__(self, cls, compact_fields=None):
+        '''
+        :param compact_fields: dict, fields removed from the class namespace
+            of a COMPACT type (see Complex_PythonType). Fields of COMPACT
+            base classes are taken from their _meta.
+        '''
         self.cls = cls
-        self.fields = []
-        self.attributes = []
-        self.groups = []
-        for attr in dir(cls):
-            item = getattr(cls, attr)
-            if isinstance(getattr(cls, attr), Attribute):
-                item._name = attr
-                self.attributes.append(item)
-            elif isinstance(item, Ref):
-                item._name = attr
-                self.groups.append(item)
-            elif isinstance(item, Element):
-                item._name = attr
-                self.fields.append(item)
-        self.fields = sorted(self.fields, key=lambda f: f._creation_number)
-        self.attributes = sorted(self.attributes, key=lambda f: f._creation_number)
-        self.groups = sorted(self.groups, key=lambda f: f._creation_number)
-        self.allelements = sorted(self.fields + self.groups, key=lambda f: f._creation_number)
-        self.all = sorted(self.fields + self.groups + self.attributes, key=lambda f: f._creation_number)
+        known_fields = {}
+        for base in reversed(cls.__mro__[1:]):
+            if getattr(base, 'COMPACT', False) and '_meta' in vars(base):
+                known_fields.update(base._meta.by_name)
+        fields = {}
+        bases = cls.__bases__
+        if len(bases) == 1 and isinstance(bases[0], Complex_PythonType):
+            # The fields inherited from a single base class are known already.
+            fields.update(bases[0]._meta.by_name)
+            namespaces = (cls,)
+        else:
+            namespaces = reversed(cls.__mro__)
+        for base in namespaces:
+            # Like getattr(cls, name): the attribute of the most derived class
+            # wins and hides inherited fields unless it is a field itself.
+            for name, item in vars(base).items():
+                if isinstance(item, Element):
+                    fields[name] = item
+                elif name in fields:
+                    del fields[name]
+        known_fields.update(compact_fields or {})
+        for name, item in known_fields.items():
+            fields.setdefault(name, item)
+        for name, item in fields.items():
+            item._name = name
+        self.all = sorted(fields.values(), key=lambda f: f._creation_number)
+        self.fields = [f for f in self.all if not isinstance(f, (Attribute, Ref))]
+        self.attributes = [f for f in self.all if isinstance(f, Attribute)]
+        self.groups = [f for f in self.all if isinstance(f, Ref)]
+        self.allelements = [f for f in self.all if not isinstance(f, Attribute)]
+        self.by_name = {f._name: f for f in self.all}
+        self.names = tuple(f._name for f in self.all)
+        self.compact = _has_slot([cls], '_hash')
+        self._tag_index = None
+        self._render_plans = {}
+        self.compiled = None  # Generated parse/render functions, see: Schema.compile().
+
+    def resolve(self):
+        '''
+        Resolves the types of all fields and builds the tag index, see:
+        Schema.freeze(). Returns the field types.
+        '''
+        for field in self.all:
+            field._evaluate_type()
+        self.tag_index
+        return [field._type for field in self.all]
+
+    @property
+    def tag_index(self):
+        '''
+        Maps child element tags to a tuple (fields, refs) of the fields and
+        references consuming elements with that tag. Keys are local names plus
+        the Clark notation ({namespace}name) for all namespaces known when the
+        index is built. It is created on first use because references may
+        point to types which can not be imported at class creation time.
+        '''
+        if self._tag_index is None:
+            index = {}
+            for field in self.fields:
+                for tag in self._tags(field):
+                    fields, refs = index.get(tag, ((), ()))
+                    index[tag] = (fields + (field,), refs)
+            for ref in self.groups:
+                ref._evaluate_type()
+                if not isinstance(ref._type, ComplexType):
+                    continue
+                for tag in ref._type._meta.tag_index:
+                    fields, refs = index.get(tag, ((), ()))
+                    index[tag] = (fields, refs + (ref,))
+            self._tag_index = index
+        return self._tag_index
+
+    def _tags(self, field):
+        names = {field._name, field.tagname} - {None}
+        namespaces = {field.namespace, self.cls.SCHEMA and self.cls.SCHEMA.targetNamespace} - {None, ''}
+        return names | {'{%s}%s' % (namespace, name) for namespace in namespaces for name in names}
+
+    def render_plan(self, namespace, elementFormDefault):
+        '''
+        Returns a tuple of (attribute name, render callable) pairs for all
+        fields, compiled once per namespace and elementFormDefault.
+        '''
+        key = (namespace, elementFormDefault)
+        try:
+            return self._render_plans[key]
+        except KeyError:
+            pass
+        plan = tuple(
+            (field._name, _field_renderer(field, field.tagname or field._name, namespace, elementFormDefault))
+            for field in self.all
+        )
+        self._render_plans[key] = plan
+        return plan
+
+    def lookup_tag(self, tag):
+        '''
+        Returns a tuple (fields, refs) for the given element tag, namespaces
+        not known to the index are ignored (like in the rest of the parser).
+        '''
+        index = self.tag_index
+        try:
+            return index[tag]
+        except KeyError:
+            pass
+        if tag[0] == '{':
+            return index.get(tag.rpartition('}')[2], ((), ()))
+        return ((), ())
+
+
+class _Chunks(list):
+    '''
+    File like object collecting the output of lxml.etree.xmlfile.
+    '''
+    write = list.append
+
+
+def _write_xmlelement(xf, xmlelement):
+    '''
+    Writes xmlelement in the current element of the lxml.etree.xmlfile xf.
+    Unlike xf.write(xmlelement) the namespaces declared by the enclosing
+    elements are not declared again (but elements without content are written
+    with an end tag).
+    '''
+    namespace = etree.QName(xmlelement).namespace
+    nsmap = {prefix: uri for prefix, uri in xmlelement.nsmap.items() if prefix and uri != namespace}
+    with xf.element(xmlelement.tag, dict(xmlelement.attrib), nsmap or None):
+        if xmlelement.text:
+            xf.write(xmlelement.text)
+        for child in xmlelement:
+            _write_xmlelement(xf, child)
+            if child.tail:
+                xf.write(child.tail)
+
+
+def _has_slot(classes, name):
+    return any(isinstance(getattr(c, name, None), types.MemberDescriptorType) for c in classes)
 
 
 class Complex_PythonType(type):
     '''
     Python type for ComplexType, builds a _meta object for every class that
     inherit from ComplexType.
+
+    Classes with COMPACT = True store their field values in __slots__ instead
+    of a per instance __dict__ which saves a lot of memory for documents with
+    many (small) objects. The field definitions are moved from the class
+    namespace to _meta (e.g. use MyType._meta.by_name['field'] instead of
+    MyType.field) and instances can not have attributes besides their fields.
+    All base classes should be COMPACT as well, otherwise instances will get a
+    __dict__ anyway.
     '''
 
     def __new__(cls, name, bases, attrs):
+        compact_fields = None
+        if attrs.get('COMPACT', any(getattr(base, 'COMPACT', False) for base in bases)):
+            compact_fields = {k: v for k, v in attrs.items() if isinstance(v, Element)}
+            slots = [k for k in list(compact_fields) + ['_xmlelement', '_hash', '_lazy'] if not _has_slot(bases, k)]
+            attrs = dict((k, v) for k, v in attrs.items() if k not in compact_fields)
+            attrs['__slots__'] = tuple(slots)
         newcls = super(Complex_PythonType, cls).__new__(cls, name, bases, attrs)
         if name != 'Complex':
-            newcls._meta = ComplexTypeMetaInfo(newcls)
+            newcls._meta = ComplexTypeMetaInfo(newcls, compact_fields)
         return newcls
 
 
@@ -965,11 +1435,25 @@ class ComplexType(six.with_metaclass(Complex_PythonType, Type)):
     INDICATOR = Sequence  # Indicator see: class Indicators. To be defined in sub-type.
     INHERITANCE = None    # Type of inheritance see: class Inheritance, to be defined in sub-type.
     SCHEMA = None
+    COMPACT = False       # Store field values in __slots__, see: class Complex_PythonType.
+
+    __slots__ = ()
+    _hash = None          # Cached hash of frozen instances, see: freeze().
+    _lazy = None          # Unparsed fields of lazily parsed instances, see: parse_xmlelement().
 
     def __new__(cls, *args, **kwargs):
         instance = super(ComplexType, cls).__new__(cls)
-        for field in instance._meta.all:
-            setattr(instance, field._name, field.empty_value())
+        set_value = super(ComplexType, instance).__setattr__
+        for field in cls._meta.all:
+            # The field is known, so skip the lookup in __setattr__ (and the
+            # validation of the None default which every type accepts).
+            value = field.empty_value()
+            if value is not None:
+                value = field.accept(value)
+            set_value(field._name, value)
+        if cls._meta.compact:
+            set_value('_hash', None)
+            set_value('_lazy', None)
         return instance
 
     def __init__(self, **kwargs):
@@ -979,31 +1463,105 @@ class ComplexType(six.with_metaclass(Complex_PythonType, Type)):
     def __setattr__(self, attr, value):
         if attr == '_xmlelement':
             super(ComplexType, self).__setattr__(attr, value)
+        elif self._hash is not None:
+            raise AttributeError("Can not set '%s', %s instance is frozen." % (attr, self.__class__.__name__))
         else:
             try:
-                field = self._find_field(self._meta.all, attr)
-                super(ComplexType, self).__setattr__(attr, field.accept(value))
-            except IndexError:
-                raise AttributeError("Model '%s' doesn't have attribute '%s'." % (self.__class__.__name__, attr))
+                field = self._meta.by_name[attr]
+            except KeyError:
+                raise ValueError("%s has no field '%s'" % (self.__class__.__name__, attr))
+            super(ComplexType, self).__setattr__(attr, field.accept(value))
+            self._drop_pending(attr)
+
+    def __setstate__(self, state):
+        '''
+        Restores copies and unpickled instances without __setattr__ which
+        rejects _hash and _lazy (and values of frozen instances).
+        '''
+        state, slots = state if isinstance(state, tuple) else (state, None)
+        if state:
+            self.__dict__.update(state)
+        set_value = super(ComplexType, self).__setattr__
+        for name, value in (slots or {}).items():
+            set_value(name, value)
+        if self._lazy is not None:
+            # The copy parses its pending fields on its own, __new__() set them.
+            pending = dict(self._lazy[0])
+            for name in pending:
+                super(ComplexType, self).__delattr__(name)
+            set_value('_lazy', (pending, self._lazy[1]))
+
+    def __getattr__(self, attr):
+        '''
+        Parses a field of a lazily parsed instance on first access. Only called
+        if the field has no value yet.
+        '''
+        lazy = self._lazy if attr != '_lazy' else None
+        if lazy is None or attr not in lazy[0]:
+            raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, attr))
+        xmlelements, options = lazy
+        field = self._meta.by_name[attr]
+        super(ComplexType, self).__setattr__(attr, field.empty_value())
+        if isinstance(field, ListElement) and _parses_in_bulk(field):
+            field.parse_many(self, attr, xmlelements[attr], **options)
+        else:
+            for xmlelement in xmlelements[attr]:
+                field.parse(self, attr, xmlelement, **options)
+        self._drop_pending(attr)
+        return getattr(self, attr)
+
+    def _drop_pending(self, attr):
+        '''Drops the references to the elements of a parsed or assigned field.'''
+        if self._lazy is None:
+            return  # setting the parsed value dropped the last field
+        xmlelements = self._lazy[0]
+        xmlelements.pop(attr, None)
+        if not xmlelements:
+            super(ComplexType, self).__setattr__('_lazy', None)
 
     def __str__(self):
         fields = {f._name: getattr(self, f._name, '<UNKNOWN FIELD>') for f in self._meta.fields}
         str_fields = ', '.join('%s=%s' % item for item in fields.items())
         return '<{class_name}: {fields}>'.format(class_name=self.__class__.__name__, fields=str_fields)
 
+    def _field_values(self):
+        return tuple(getattr(self, name) for name in self._meta.names)
+
+    def freeze(self):
+        '''
+        Makes this instance and all nested instances immutable: lists are
+        replaced by tuples, setting a field raises an AttributeError and the
+        hash is computed only once. Returns the instance.
+        '''
+        if self._hash is None:
+            set_value = super(ComplexType, self).__setattr__
+            for name, value in zip(self._meta.names, self._field_values()):
+                set_value(name, _freeze(value))
+            set_value('_hash', hash((self.__class__, _hashable(self._field_values()))))
+        return self
+
     def __hash__(self):
-        # FIXME: We should do this without the conversion back to XML.
-        return hash(etree.tostring(self._xmlelement)) if hasattr(self, '_xmlelement') else id(self)
+        if self._hash is not None:
+            return self._hash
+        return hash((self.__class__, _hashable(self._field_values())))
 
     def __eq__(self, other):
-        # FIXME: We should do this without the conversion back to XML.
-        return hasattr(self, '_xmlelement') and hasattr(other, '_xmlelement') \
-            and etree.tostring(self._xmlelement) == etree.tostring(other._xmlelement)
+        if self is other:
+            return True
+        if self.__class__ is not other.__class__:
+            return False
+        if self._hash is not None and other._hash is not None and self._hash != other._hash:
+            return False
+        for name in self._meta.names:
+            if not _values_equal(getattr(self, name), getattr(other, name)):
+                return False
+        return True
 
     def __lt__(self, other):
-        # FIXME: We should do this without the conversion back to XML.
-        return hasattr(self, '_xmlelement') and hasattr(other, '_xmlelement') \
-            and etree.tostring(self._xmlelement) < etree.tostring(other._xmlelement)
+        if not isinstance(other, ComplexType):
+            return NotImplemented
+        return (self.__class__.__name__, _sort_key(self._field_values())) < \
+            (other.__class__.__name__, _sort_key(other._field_values()))
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -1024,13 +1582,47 @@ class ComplexType(six.with_metaclass(Complex_PythonType, Type)):
             return None
         if self.SCHEMA:
             namespace = self.SCHEMA.targetNamespace
-        for field in instance._meta.all:
-            field.render(
-                parent=parent,
-                field_name=field.tagname or field._name,
-                value=getattr(instance, field._name),
-                namespace=namespace,
-                elementFormDefault=elementFormDefault)
+        compiled = instance._meta.compiled
+        if compiled is not None:
+            compiled.renderer(namespace, elementFormDefault)(parent, instance)
+            return
+        for name, render_field in instance._meta.render_plan(namespace, elementFormDefault):
+            render_field(parent, getattr(instance, name))
+
+    def _write(self, xf, tagname, instance, namespace=None, elementFormDefault=None):
+        '''
+        Streaming counterpart of render() which writes the element for
+        instance to the lxml.etree.xmlfile xf. Lists and nested complex types
+        are written element by element, everything else is rendered with the
+        usual render plan first. Yields after every list item written.
+        '''
+        if self.SCHEMA:
+            namespace = self.SCHEMA.targetNamespace
+        meta = instance._meta
+        plan = tuple(zip(meta.all, meta.render_plan(namespace, elementFormDefault)))
+        attributes = etree.Element('attributes')
+        for field, (name, render_field) in plan:
+            if isinstance(field, Attribute):
+                render_field(attributes, getattr(instance, name))
+        with xf.element(tagname, dict(attributes.attrib)):
+            for field, (name, render_field) in plan:
+                value = getattr(instance, name)
+                if isinstance(field, Attribute):
+                    continue
+                elif type(field) is ListElement:
+                    for _ in field._write(xf, name, value, namespace, elementFormDefault):
+                        yield
+                elif type(field) is Element and isinstance(value, ComplexType):
+                    field._evaluate_type()
+                    field_namespace, field_tag = field._qualified_tag(
+                        field.tagname or name, namespace, elementFormDefault)
+                    for _ in field._type._write(xf, field_tag, value, field_namespace, elementFormDefault):
+                        yield
+                else:
+                    content = etree.Element('content')
+                    render_field(content, value)
+                    for xmlelement in content:
+                        _write_xmlelement(xf, xmlelement)
 
     @classmethod
     def _find_field(cls, fields, name):
@@ -1072,55 +1664,181 @@ class ComplexType(six.with_metaclass(Complex_PythonType, Type)):
         return subelements
 
     @classmethod
-    def parse_xmlelement(cls, xmlelement):
+    def parse_xmlelement(cls, xmlelement, **options):
+        '''
+        Builds an instance (and all nested instances) from xmlelement.
+
+        :param keep_xmlelement: bool, default True. Store the parsed element as
+            _xmlelement on every instance. Without it no instance keeps a
+            reference to the (whole) lxml document.
+        :param lazy: bool, default False. Parse fields (and nested instances)
+            on first access instead of up front. Lazily parsed instances keep
+            a reference to their lxml elements until all fields were accessed.
+        :param trusted: bool, default False. Assign the parsed values without
+            validating them against the facets of their types (accept()),
+            e.g. because the XML was validated with an XML schema already.
+        '''
+        return cls._parse_children(xmlelement, xmlelement, **options)
+
+    @classmethod
+    def _parse_children(cls, xmlelement, children, **options):
+        '''
+        Walks the child elements once and hands every child to the field(s)
+        registered for its tag. Children of referenced types (xsd.Ref) are
+        collected and parsed by the reference afterwards.
+        '''
+        compiled = cls._meta.compiled
+        if compiled is not None and not options.get('lazy'):
+            parse = compiled.parse_trusted if options.get('trusted') else compiled.parse
+            if parse is not None:
+                return parse(cls, xmlelement, children, options)
         instance = cls()
-        instance._xmlelement = xmlelement
-        for attribute in instance._meta.attributes:
-            attribute.parse(instance, attribute._name, xmlelement)
-
-        is_choice = (instance._meta.cls.INDICATOR == Choice)
-        for field in instance._meta.fields:
-            if is_choice:
-                if not cls._is_matching_element(field, xmlelement):
-                    continue
-                subelements = [xmlelement]
+        if options.get('keep_xmlelement', True):
+            instance._xmlelement = xmlelement
+        meta = cls._meta
+        # With lazy=True the elements are only collected per field, see: __getattr__.
+        pending = {} if options.get('lazy') else None
+        for attribute in meta.attributes:
+            if pending is None:
+                attribute.parse(instance, attribute._name, xmlelement, **options)
             else:
-                subelements = cls._find_subelement(field, xmlelement)
-            for subelement in subelements:
-                field.parse(instance, field._name, subelement)
-            if is_choice:
-                break
-
-        for group in instance._meta.groups:
-            group.parse(instance, group._name, xmlelement)
+                pending[attribute._name] = [xmlelement]
+
+        is_choice = (cls.INDICATOR == Choice)
+        if is_choice:
+            fields, _ = meta.lookup_tag(xmlelement.tag)
+            if fields and pending is None:
+                fields[0].parse(instance, fields[0]._name, xmlelement, **options)
+            elif fields:
+                pending[fields[0]._name] = [xmlelement]
+
+        ref_children = {}
+        list_children = {}  # the items of ListElements are parsed in bulk
+        lookup_tag = meta.lookup_tag
+        for child in children:
+            tag = child.tag
+            if not isinstance(tag, six.string_types):
+                continue  # comments and processing instructions
+            fields, refs = lookup_tag(tag)
+            if not is_choice:
+                for field in fields:
+                    if pending is not None:
+                        pending.setdefault(field._name, []).append(child)
+                    elif isinstance(field, ListElement) and _parses_in_bulk(field):
+                        list_children.setdefault(field, []).append(child)
+                    else:
+                        field.parse(instance, field._name, child, **options)
+            for ref in refs:
+                ref_children.setdefault(ref, []).append(child)
+
+        for field, elements in list_children.items():
+            field.parse_many(instance, field._name, elements, **options)
+
+        for group in meta.groups:
+            group.parse(instance, group._name, xmlelement, ref_children.get(group, ()), **options)
+
+        if pending:
+            for name in pending:
+                super(ComplexType, instance).__delattr__(name)
+            super(ComplexType, instance).__setattr__('_lazy', (pending, options))
 
         return instance
 
     @classmethod
     def __parse_with_validation(cls, xml, schema):
-        from .py2xsd import generate_xsd
-        schema = generate_xsd(schema)
-        schemaelement = etree.XMLSchema(schema)
+        from .py2xsd import get_xml_schema
+        schemaelement = get_xml_schema(schema)
         if isinstance(xml, six.string_types):
-            parser = etree.XMLParser(schema=schemaelement)
-            xmlelement = etree.fromstring(xml, parser)
+            xmlelement = parsers.fromstring(xml, schemaelement)
         else:
             schemaelement.assertValid(xml)
             xmlelement = xml
         return xmlelement
 
     @classmethod
-    def parsexml(cls, xml, schema=None):
-        if schema is None:
-            parser = etree.fromstring
-        else:
+    def parsexml(cls, xml, schema=None, parser_options=None, **options):
+        '''
+        Parses the XML document (string) as instance of this class.
+
+        :param schema: xsd.Schema or lxml.etree.XMLSchema, if given the
+            document is validated while parsing (and trusted afterwards).
+        :param parser_options: dict, options for the lxml parser, see:
+            soapfish.parsers.get_parser().
+        :param options: parse options, see: parse_xmlelement().
+        '''
+        if schema is not None:
             if not isinstance(schema, etree.XMLSchema):
-                from .py2xsd import generate_xsd
-                schema = etree.XMLSchema(generate_xsd(schema))
-            xmlparser = etree.XMLParser(schema=schema)
-            parser = functools.partial(etree.fromstring, parser=xmlparser)
-        xmlelement = parser(xml)
-        return cls.parse_xmlelement(xmlelement)
+                from .py2xsd import get_xml_schema
+                schema = get_xml_schema(schema)
+            options.setdefault('trusted', True)
+        xmlelement = parsers.fromstring(xml, schema, **(parser_options or {}))
+        return cls.parse_xmlelement(xmlelement, **options)
+
+    @classmethod
+    def iterparse(cls, source, path, **options):
+        '''
+        Parses the items of a ListElement one at a time without building the
+        whole document, e.g. for huge responses. Every parsed item is removed
+        from the tree (so instances never keep their XML) and the elements
+        which are not part of the path are dropped as well.
+
+        :param source: filename or file object, see: lxml.etree.iterparse.
+        :param path: str, field names from this type to the list field
+            separated by dots, e.g. 'orders.lines'.
+        :returns: generator of the list items.
+        '''
+        if options.get('lazy'):
+            raise ValueError('Lazy parsing is not supported by iterparse().')
+        options['keep_xmlelement'] = False
+        list_field, tags = cls._list_path(path)
+        return cls._iterparse(source, list_field, tags, options)
+
+    @classmethod
+    def _iterparse(cls, source, list_field, tags, options):
+        item_level = len(tags) + 1  # The root element is level 1.
+
+        level = matched = 0
+        for event, xmlelement in etree.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                level += 1
+                if level == 1:
+                    matched = level
+                elif matched == level - 1 and level <= item_level and \
+                        etree.QName(xmlelement).localname == tags[level - 2]:
+                    matched = level
+                continue
+            if matched == level:
+                matched -= 1
+                if level == item_level:
+                    yield list_field.parse_item(xmlelement, **options)
+                    xmlelement.clear()
+                    while xmlelement.getprevious() is not None:
+                        del xmlelement.getparent()[0]
+            elif matched == level - 1 and level <= item_level:
+                xmlelement.clear()  # Not part of the path.
+            level -= 1
+
+    @classmethod
+    def _list_path(cls, path):
+        '''
+        Returns the ListElement at path and the tag names of the elements
+        leading to its items (references do not have their own element).
+        '''
+        _type = cls
+        tags = []
+        field = None
+        for name in path.split('.'):
+            if field is not None:
+                field._evaluate_type()
+                _type = field._type
+            if not isinstance(_type, (ComplexType, Complex_PythonType)) or name not in _type._meta.by_name:
+                raise ValueError("Invalid path '%s', no field '%s'." % (path, name))
+            field = _type._meta.by_name[name]
+            if not isinstance(field, Ref):
+                tags.append(field.tagname or field._name)
+        if not isinstance(field, ListElement):
+            raise ValueError("Invalid path '%s', not a ListElement." % path)
+        return field, tags
 
     def xml(self, tagname, namespace=None, elementFormDefault=None, schema=None, pretty_print=True):
         if namespace:
@@ -1131,6 +1849,36 @@ class ComplexType(six.with_metaclass(Complex_PythonType, Type)):
             schema.assertValid(xmlelement)
         return etree.tostring(xmlelement, pretty_print=pretty_print)
 
+    def write_xml(self, output, tagname, namespace=None, elementFormDefault=None):
+        '''
+        Like xml() but writes the XML incrementally to output (a filename or a
+        file object) without building the whole tree first. ListElement fields
+        may hold any iterable, e.g. a generator, which is consumed while
+        writing so large documents can be written with little memory.
+        '''
+        with etree.xmlfile(output) as xf:
+            for _ in self._write_root(xf, tagname, namespace, elementFormDefault):
+                pass
+
+    def iterxml(self, tagname, namespace=None, elementFormDefault=None):
+        '''
+        Like write_xml() but yields the XML as chunks of bytes, e.g. for a
+        streaming HTTP response.
+        '''
+        output = _Chunks()
+        with etree.xmlfile(output) as xf:
+            for _ in self._write_root(xf, tagname, namespace, elementFormDefault):
+                if output:
+                    yield b''.join(output)
+                    del output[:]
+        if output:
+            yield b''.join(output)
+
+    def _write_root(self, xf, tagname, namespace, elementFormDefault):
+        if namespace:
+            tagname = '{%s}%s' % (namespace, tagname)
+        return self._write(xf, tagname, self, namespace, elementFormDefault)
+
     @classmethod
     def _force_elements_type_evalution(cls):
         '''
@@ -1145,14 +1893,14 @@ class Group(ComplexType):
     '''
     Parent object for XSD Groups. Marker. Must be used with Ref.
     '''
-    pass
+    __slots__ = ()
 
 
 class AttributeGroup(Group):
     '''
     Parent object for XSD Attribute Groups. Marker. Must be used with Ref.
     '''
-    pass
+    __slots__ = ()
 
 
 class Document(ComplexType):
@@ -1181,7 +1929,7 @@ class Document(ComplexType):
     @classmethod
     def parsexml(cls, xml):
         field = cls._meta.fields[0]  # The only field.
-        xmlelement = etree.fromstring(xml)
+        xmlelement = parsers.fromstring(xml)
         field.parse(cls, field._name, xmlelement)
 
 
@@ -1227,7 +1975,7 @@ class Schema(object):
 
     def __init__(self, targetNamespace, elementFormDefault=ElementFormDefault.UNQUALIFIED,
                  simpleTypes=[], attributeGroups=[], groups=[], complexTypes=[], elements={},
-                 imports=(), includes=(), location=None):
+                 imports=(), includes=(), location=None, lazy=False):
         '''
         :param targetNamespace: string, xsd namespace URL.
         :param elementFormDefault: unqualified/qualified. Defines if namespaces
@@ -1238,39 +1986,113 @@ class Schema(object):
         :param groups: List of objects that extend xsd.Group.
         :param complexTypes: List of complexTypes class.
         :param elements: dict of xsd.Elements that are direct schema elements.
+        :param lazy: If True the types are only resolved when the lists above
+            are used for the first time, they may be given as import paths
+            like the type of an Element. The types of the elements are
+            evaluated when the elements are used.
         '''
         self.targetNamespace = targetNamespace
         self.elementFormDefault = elementFormDefault
-        self.simpleTypes = simpleTypes
-        self.attributeGroups = attributeGroups
-        self.groups = groups
-        self.complexTypes = complexTypes
         self.elements = elements
         self.imports = imports
         self.includes = includes
         self.location = location
-
-        self.__init_schema(self.simpleTypes)
-        self.__init_schema(self.groups)
-        self.__init_schema(self.attributeGroups)
-        self.__init_schema(self.complexTypes)
+        self.frozen = False
+        self.__declared_types = (simpleTypes, attributeGroups, groups, complexTypes)
+        self.__types = None
 
         for element in self.elements.values():
-            if isinstance(element._passed_type, ComplexType):
-                element._passed_type.__class__.SCHEMA = self
             if element.namespace is None:
                 element.namespace = targetNamespace
 
-        self._force_elements_type_evalution(self.complexTypes)
-        self._force_elements_type_evalution(self.attributeGroups)
-        self._force_elements_type_evalution(self.groups)
+        if not lazy:
+            self.__resolve_types()
+
+    @property
+    def simpleTypes(self):
+        return (self.__types or self.__resolve_types())[0]
+
+    @property
+    def attributeGroups(self):
+        return (self.__types or self.__resolve_types())[1]
+
+    @property
+    def groups(self):
+        return (self.__types or self.__resolve_types())[2]
+
+    @property
+    def complexTypes(self):
+        return (self.__types or self.__resolve_types())[3]
+
+    def __resolve_types(self):
+        if self.__types is not None:
+            return self.__types
+        types = tuple([import_type(t) if isinstance(t, six.string_types) else t for t in declared]
+                      for declared in self.__declared_types)
+        simpleTypes, attributeGroups, groups, complexTypes = types
+
+        self._force_elements_type_evalution(complexTypes)
+        self._force_elements_type_evalution(attributeGroups)
+        self._force_elements_type_evalution(groups)
 
         for element in self.elements.values():
             element._evaluate_type()
 
-    def __init_schema(self, types):
-        for _type in types:
+        # The types are assigned to this schema only when it is fully
+        # initialized as other threads may use them already.
+        for _type in itertools.chain(*types):
             _type.SCHEMA = self
+        for element in self.elements.values():
+            if isinstance(element._passed_type, ComplexType):
+                element._passed_type.__class__.SCHEMA = self
+
+        with _evaluate_type_lock:
+            if self.__types is None:
+                self.__types = types
+        return self.__types
+
+    def compile(self):
+        '''
+        Replaces the generic parsing and rendering of the complex types in
+        this schema (and in imported and included schemas) with functions
+        generated for every type, see: soapfish.xsd_compiler. Returns self.
+        '''
+        from .xsd_compiler import compile_schema
+        compile_schema(self)
+        return self
+
+    def freeze(self):
+        '''
+        Resolves the types of all elements in this schema (and in imported and
+        included schemas) including the elements of nested complex types,
+        builds their tag indexes and compiles the facets of simple types.
+        Afterwards parsing does not change the schema objects. Rendering still
+        caches a render plan (and a compiled renderer, see: compile()) per
+        namespace and elementFormDefault on first use; these caches are only
+        added to, so a frozen schema can be shared by threads. Returns self.
+        '''
+        if self.frozen:
+            return self
+        schemas = _schema_closure(self)
+        pending = []
+        for schema in schemas:
+            pending.extend(itertools.chain(schema.complexTypes, schema.groups, schema.attributeGroups))
+            for element in schema.elements.values():
+                element._evaluate_type()
+                pending.append(element._type)
+        seen = set()
+        while pending:
+            _type = pending.pop()
+            if isinstance(_type, SimpleType):
+                _type._precompile()
+                continue
+            cls = type(_type) if isinstance(_type, ComplexType) else _type
+            if isinstance(cls, type) and issubclass(cls, ComplexType) and cls not in seen:
+                seen.add(cls)
+                pending.extend(cls._meta.resolve())
+        for schema in schemas:
+            schema.frozen = True
+        return self
 
     def _force_elements_type_evalution(self, types):
         for t in types:
@@ -1288,6 +2110,19 @@ class Schema(object):
         return None
 
 
+def _schema_closure(schema):
+    '''
+    Returns the schema and all schemas imported or included by it (directly
+    or indirectly).
+    '''
+    schemas = [schema]
+    for current in schemas:
+        for other in itertools.chain(current.imports, current.includes):
+            if not any(other is known for known in schemas):
+                schemas.append(other)
+    return schemas
+
+
 class Method(object):
     '''
     Method description. The main information is mapping soapAction and
@@ -14,6 +14,7 @@ import six
 from lxml import etree
 
 from . import xsdspec
+from .lazy import make_lazy
 from .utils import (
     find_xsd_namespaces,
     get_rendering_environment,
@@ -59,7 +60,7 @@ def resolve_import(i, known_paths, known_types, parent_namespace, cwd, base_path
 def generate_code_from_xsd(xml, known_paths=None, known_types=None,
                            location=None, parent_namespace=None,
                            encoding='utf8', cwd=None, base_path=None,
-                           standalone=True):
+                           standalone=True, lazy=False):
 
     if isinstance(xml, six.binary_type):
         xml = etree.fromstring(xml)
@@ -81,6 +82,8 @@ def generate_code_from_xsd(xml, known_paths=None, known_types=None,
     code = schema_to_py(schema, xsd_namespaces, known_paths, known_types,
                         location, cwd=cwd, base_path=base_path,
                         standalone=standalone)
+    if lazy:
+        code = make_lazy(code)
 
     return code.encode(encoding) if encoding else code
 
@@ -178,13 +181,15 @@ def main(argv=None):
     parser.add_argument('xsd', help='Input path to an XSD document.')
     parser.add_argument('output', help='Output path for Python code.', nargs='?',
                         type=argparse.FileType('wb'), default=stdout)
+    parser.add_argument('-l', '--lazy', help='Define the types on first use (requires Python 3.7).',
+                        action='store_true')
     opt = parser.parse_args(sys.argv[1:] if argv is None else argv)
 
     logger.info('Generating code for XSD document: %s' % opt.xsd)
     xml = stdin.read() if opt.xsd == '-' else open_document(opt.xsd)
     cwd = opt.xsd if '://' in opt.xsd else os.path.abspath(opt.xsd)
     cwd = os.path.dirname(cwd)
-    code = generate_code_from_xsd(xml, encoding='utf-8', cwd=cwd)
+    code = generate_code_from_xsd(xml, encoding='utf-8', cwd=cwd, lazy=opt.lazy)
 
     opt.output.write(code.strip())
 
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+'''
+Generates specialized parse and render functions for the complex types of a
+schema, see: xsd.Schema.compile().
+
+The generic code in xsd.py walks the fields of a type and calls parse() and
+render() of every field which checks the field and value types again for each
+value. The generated functions do the same work with the field loop unrolled,
+the tag names precomputed and the conversions of simple types called
+directly. Fields which can not be inlined (e.g. fields with custom render or
+parse methods) are handled by the generic code of the field.
+'''
+
+from __future__ import absolute_import
+
+import functools
+import itertools
+import keyword
+import re
+
+import six
+
+from . import xsd
+
+
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def compile_schema(schema, _seen=None):
+    '''
+    Compiles all complex types of the schema and of its imported and included
+    schemas.
+    '''
+    seen = set() if _seen is None else _seen
+    if id(schema) in seen:
+        return
+    seen.add(id(schema))
+    types = list(schema.complexTypes)
+    for element in schema.elements.values():
+        element._evaluate_type()
+        if isinstance(element._type, xsd.ComplexType):
+            types.append(element._type.__class__)
+    for cls in types:
+        if cls._meta.compiled is None:
+            compile_type(cls)
+    for other in itertools.chain(schema.imports, schema.includes):
+        compile_schema(other, seen)
+
+
+def compile_type(cls):
+    '''
+    Generates the parse and render functions for a ComplexType class and
+    stores them as cls._meta.compiled.
+    '''
+    compiled = CompiledType(cls)
+    cls._meta.compiled = compiled
+    return compiled
+
+
+class CompiledType(object):
+    '''
+    The generated functions of a ComplexType class. parse and parse_trusted
+    (which does not validate the values) are None if the type is not
+    supported by the compiler (choices, references and overlapping tags),
+    render functions are generated on first use for every namespace and
+    elementFormDefault.
+    '''
+
+    def __init__(self, cls):
+        self.cls = cls
+        for field in cls._meta.all:
+            field._evaluate_type()
+        self.parse = _compile_parse(cls)
+        self.parse_trusted = _compile_parse(cls, trusted=True)
+        self._renderers = {}
+
+    def renderer(self, namespace, elementFormDefault):
+        key = (namespace, elementFormDefault)
+        try:
+            return self._renderers[key]
+        except KeyError:
+            pass
+        render = _compile_render(self.cls, namespace, elementFormDefault)
+        self._renderers[key] = render
+        return render
+
+
+def _function(method):
+    return getattr(method, '__func__', method)
+
+
+def _is_text_type(_type):
+    '''
+    Returns True if values of the type are rendered and parsed as element
+    text by the methods of xsd.SimpleType.
+    '''
+    cls = type(_type)
+    return isinstance(_type, xsd.SimpleType) and \
+        _function(cls.render) is _function(xsd.SimpleType.render) and \
+        _function(cls.parse_xmlelement) is _function(xsd.SimpleType.parse_xmlelement)
+
+
+def _get_value(name):
+    if IDENTIFIER.match(name) and not keyword.iskeyword(name):
+        return 'instance.%s' % name
+    return 'getattr(instance, %r)' % name
+
+
+def _exec(cls, source, symbols, name):
+    code = compile(source, '<compiled %s.%s>' % (cls.__name__, name), 'exec')
+    six.exec_(code, symbols)
+    return symbols[name]
+
+
+def _compile_parse(cls, trusted=False):
+    meta = cls._meta
+    if meta.groups or cls.INDICATOR == xsd.Choice:
+        return None
+    tags = {}
+    for tag, (fields, _) in meta.tag_index.items():
+        if len(fields) > 1:
+            return None
+        tags[tag] = meta.fields.index(fields[0])
+
+    symbols = {
+        'NIL': xsd.NIL,
+        'XSI_NIL': xsd.XSI_NIL,
+        'string_types': six.string_types,
+        'new_instance': object.__new__,
+        'set_value': object.__setattr__,
+        'TypedList': xsd.TypedList,
+        'list_append': list.append,
+        'tags': tags,
+    }
+    lines = ['def parse(cls, xmlelement, children, options):']
+    lines.extend(_new_instance(cls, symbols))
+    lines.extend([
+        "    if options.get('keep_xmlelement', True):",
+        "        set_value(instance, '_xmlelement', xmlelement)",
+    ])
+
+    def accepted(name, value):
+        # Like setattr(instance, name, value) which validates the value with accept().
+        return value if trusted else 'accept_%s(%s)' % (name, value)
+
+    for i, attribute in enumerate(meta.attributes):
+        symbols.update({
+            'attribute_default_%d' % i: attribute.default,
+            'accept_attribute_%d' % i: attribute._type.accept,
+            'attribute_pythonvalue_%d' % i: attribute._type._pythonvalue,
+        })
+        lines.extend([
+            '    value = xmlelement.get(%r)' % attribute._name,
+            '    if value is None:',
+            '        value = attribute_default_%d' % i,
+            '    set_value(instance, %r, %s)' % (
+                attribute._name, accepted('attribute_%d' % i, 'attribute_pythonvalue_%d(value)' % i)),
+        ])
+
+    branches = []
+    list_fields = []
+    for i, field in enumerate(meta.fields):
+        if type(field) not in (xsd.Element, xsd.ListElement):
+            symbols['field_%d' % i] = field
+            branches.append((i, ['field_%d.parse(instance, %r, child, **options)' % (i, field._name)]))
+            continue
+        if _is_text_type(field._type):
+            symbols['pythonvalue_%d' % i] = field._type._pythonvalue
+            parse_value = 'pythonvalue_%d(child.text)' % i
+        else:
+            symbols['parse_%d' % i] = field._type.parse_xmlelement
+            parse_value = 'parse_%d(child, **options)' % i
+
+        if type(field) is xsd.ListElement:
+            # The items are collected and added at the end with TypedList.extend()
+            # which validates all values at once.
+            lines.append('    list_%d = %s' % (i, _get_value(field._name)))
+            if trusted:
+                append = 'list_append(list_%d, %%s)' % i
+            else:
+                lines.append('    items_%d = []' % i)
+                list_fields.append(i)
+                append = 'items_%d.append(%%s)' % i
+            branches.append((i, [
+                'if child.get(XSI_NIL):',
+                '    ' + append % 'NIL',
+                'else:',
+                '    ' + append % parse_value,
+            ]))
+            continue
+        symbols['accept_%d' % i] = field._type.accept
+        if field.nillable:
+            if_nil = 'set_value(instance, %r, NIL)' % field._name
+        else:
+            if_nil = "raise ValueError('Nil value for not nillable element.')"
+        branches.append((i, [
+            "if child.get(XSI_NIL) == 'true':",
+            '    ' + if_nil,
+            'else:',
+            '    set_value(instance, %r, %s)' % (field._name, accepted(i, parse_value)),
+        ]))
+
+    if branches:
+        lines.extend([
+            '    for child in children:',
+            '        tag = child.tag',
+            '        index = tags.get(tag)',
+            '        if index is None:',
+            "            if not isinstance(tag, string_types) or tag[0] != '{':",
+            '                continue',
+            "            index = tags.get(tag.rpartition('}')[2])",
+            '            if index is None:',
+            '                continue',
+        ])
+        for n, (i, body) in enumerate(branches):
+            lines.append('        %s index == %d:' % ('if' if n == 0 else 'elif', i))
+            lines.extend('            ' + line for line in body)
+    for i in list_fields:
+        lines.extend([
+            '    if items_%d:' % i,
+            '        list_%d.extend(items_%d)' % (i, i),
+        ])
+    lines.append('    return instance')
+    return _exec(cls, '\n'.join(lines) + '\n', symbols, 'parse')
+
+
+def _new_instance(cls, symbols):
+    '''
+    Returns the lines creating an instance like ComplexType.__new__ does, with
+    the empty values of all fields.
+    '''
+    if cls.__new__ is not xsd.ComplexType.__new__ or \
+            _function(cls.__init__) is not _function(xsd.ComplexType.__init__):
+        return ['    instance = cls()']
+    lines = ['    instance = new_instance(cls)']
+    for i, field in enumerate(cls._meta.all):
+        if type(field) in (xsd.Element, xsd.Attribute) and field.default is None:
+            value = 'None'
+        elif type(field) is xsd.ListElement:
+            symbols['list_field_%d' % i] = field
+            value = 'TypedList(list_field_%d)' % i
+        else:
+            symbols['empty_value_%d' % i] = functools.partial(_empty_value, field)
+            value = 'empty_value_%d()' % i
+        lines.append('    set_value(instance, %r, %s)' % (field._name, value))
+    if cls._meta.compact:
+        lines.extend(["    set_value(instance, '_hash', None)", "    set_value(instance, '_lazy', None)"])
+    return lines
+
+
+def _empty_value(field):
+    value = field.empty_value()
+    if value is not None:
+        value = field.accept(value)
+    return value
+
+
+def _compile_render(cls, namespace, elementFormDefault):
+    meta = cls._meta
+    plan = meta.render_plan(namespace, elementFormDefault)
+    symbols = {
+        'NIL': xsd.NIL,
+        'XSI_NIL': xsd.XSI_NIL,
+        'elementFormDefault': elementFormDefault,
+    }
+    lines = ['def render(parent, instance):']
+    for i, (field, (name, render_field)) in enumerate(zip(meta.all, plan)):
+        value = _get_value(name)
+        tagname = field.tagname or field._name
+        if type(field) is xsd.Attribute:
+            symbols.update({'tag_%d' % i: tagname, 'xmlvalue_%d' % i: field._type.xmlvalue})
+            if field._minOccurs:
+                if_none = "raise ValueError('Value None is not acceptable for required field.')"
+            else:
+                if_none = 'pass'
+            if field.nillable:
+                if_nil = "parent.set(tag_%d, 'nil')" % i
+            else:
+                if_nil = "raise ValueError('Nil value for not nillable Attribute.')"
+            lines.extend([
+                '    value = %s' % value,
+                '    if value is None:',
+                '        ' + if_none,
+                '    elif value is NIL:',
+                '        ' + if_nil,
+                '    else:',
+                '        parent.set(tag_%d, xmlvalue_%d(value))' % (i, i),
+            ])
+            continue
+        elif type(field) not in (xsd.Element, xsd.ListElement):
+            symbols['render_%d' % i] = render_field
+            lines.append('    render_%d(parent, %s)' % (i, value))
+            continue
+
+        if type(field) is xsd.ListElement:
+            tagname = field.tagname
+        field_namespace, tag = field._qualified_tag(tagname, namespace, elementFormDefault)
+        symbols.update({
+            'tag_%d' % i: tag,
+            'new_element_%d' % i: xsd._element_factory(tag),
+            'namespace_%d' % i: field_namespace,
+        })
+        if _is_text_type(field._type):
+            symbols['xmlvalue_%d' % i] = field._type.xmlvalue
+            render_value = 'element.text = xmlvalue_%d(%%s)' % i
+        else:
+            symbols['render_type_%d' % i] = field._type.render
+            render_value = 'render_type_%d(element, %%s, namespace_%d, elementFormDefault)' % (i, i)
+
+        if type(field) is xsd.Element:
+            lines.extend([
+                '    value = %s' % value,
+                '    if value is not None:',
+                '        element = new_element_%d(parent, tag_%d)' % (i, i),
+                '        if value is NIL:',
+                "            element.set(XSI_NIL, 'true')",
+                '        else:',
+                '            ' + render_value % 'value',
+            ])
+            continue
+
+        lines.append('    items = %s' % value)
+        for limit, check, occurs in (('minOccurs', '<', field._minOccurs), ('maxOccurs', '>', field._maxOccurs)):
+            if not occurs:
+                continue
+            symbols.update({
+                '%s_%d' % (limit, i): occurs,
+                '%s_message_%d' % (limit, i): 'For %s %s=%%d but list length %%d.' % (tagname, limit),
+            })
+            lines.extend([
+                '    if len(items) %s %s_%d:' % (check, limit, i),
+                '        raise ValueError(%s_message_%d %% (%s_%d, len(items)))' % (limit, i, limit, i),
+            ])
+        lines.extend([
+            '    for item in items:',
+            '        element = new_element_%d(parent, tag_%d)' % (i, i),
+            '        if item is NIL:',
+            "            element.set(XSI_NIL, 'true')",
+            '        else:',
+            '            ' + render_value % 'item',
+        ])
+    lines.append('    return None')
+    return _exec(cls, '\n'.join(lines) + '\n', symbols, 'render')
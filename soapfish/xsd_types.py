@@ -24,7 +24,12 @@ class XSDDate(object):
     datetime.date (with an optional time zone attached) but you should not
     assume that this will be true forever (see LIMITATIONS.md for further
     information).
+
+    Instances only store the four attributes (__slots__) as large documents
+    can contain many dates.
     """
+    __slots__ = ('year', 'month', 'day', 'tzinfo')
+
     def __init__(self, year, month, day, tzinfo=None):
         self.year = year
         self.month = month
@@ -55,6 +60,9 @@ class XSDDate(object):
         return date(self.year, self.month, self.day)
 
     def __eq__(self, other):
+        if isinstance(other, XSDDate):
+            return (self.year, self.month, self.day, self.tzinfo) == \
+                (other.year, other.month, other.day, other.tzinfo)
         attrs = ('year', 'month', 'day', 'tzinfo')
         for key in attrs:
             if not hasattr(other, key):
@@ -68,5 +76,14 @@ class XSDDate(object):
     def __ne__(self, other):
         return not (self == other)
 
+    def __hash__(self):
+        return hash((self.year, self.month, self.day, self.tzinfo))
+
+    def __getstate__(self):
+        return (self.year, self.month, self.day, self.tzinfo)
+
+    def __setstate__(self, state):
+        self.year, self.month, self.day, self.tzinfo = state
+
     def __repr__(self):
         return 'XSDDate(%r, %r, %r, tzinfo=%r)' % (self.year, self.month, self.day, self.tzinfo)
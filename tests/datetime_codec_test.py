@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+
+from datetime import date, datetime, time, timedelta
+
+import iso8601
+from pythonic_testcase import PythonicTestCase, assert_equals, assert_raises, assert_true
+
+from soapfish import datetime_codec
+from soapfish.xsd_types import XSDDate
+
+
+class TimezoneTest(PythonicTestCase):
+    def test_reuses_timezones_with_same_offset(self):
+        tz = datetime_codec.get_timezone('+01:30')
+        assert_equals(timedelta(hours=1, minutes=30), tz.utcoffset(None))
+        assert_true(tz is datetime_codec.get_timezone('+01:30'))
+        assert_true(tz is datetime_codec.get_timezone('+0130'))
+        assert_equals(timedelta(hours=-2), datetime_codec.get_timezone('-02').utcoffset(None))
+        assert_true(iso8601.UTC is datetime_codec.get_timezone('Z'))
+
+    def test_parsed_values_share_timezones(self):
+        first = datetime_codec.parse_datetime('2011-06-30T20:19:00+03:00')
+        second = datetime_codec.parse_time('20:19:00+0300')
+        assert_true(first.tzinfo is second.tzinfo)
+
+
+class ParseTest(PythonicTestCase):
+    def test_can_parse_datetime(self):
+        assert_equals(datetime(2011, 6, 30, 20, 19, 0, 250000, tzinfo=iso8601.FixedOffset(-2, -30, '-02:30')),
+                      datetime_codec.parse_datetime('2011-06-30T20:19:00.25-02:30'))
+        parsed = datetime_codec.parse_datetime('2011-06-30T20:19:00')
+        assert_equals(datetime(2011, 6, 30, 20, 19, 0, tzinfo=iso8601.UTC), parsed)
+        assert_true(parsed.tzinfo is iso8601.UTC)
+
+    def test_uses_iso8601_for_other_formats(self):
+        assert_equals(datetime(2011, 6, 30, 0, 19, tzinfo=iso8601.UTC),
+                      datetime_codec.parse_datetime('20110630T001900Z'))
+        assert_equals(datetime(2011, 6, 30, 0, 19, 0, 123456, tzinfo=iso8601.UTC),
+                      datetime_codec.parse_datetime('2011-06-30T00:19:00.1234567Z'))
+        assert_raises(ValueError, lambda: datetime_codec.parse_datetime('2011-13-30T00:19:00Z'))
+        assert_raises(ValueError, lambda: datetime_codec.parse_datetime('invalid'))
+
+    def test_can_parse_time(self):
+        assert_equals(time(23, 59, 59, 500000, tzinfo=iso8601.FixedOffset(1, 0, '+01:00')),
+                      datetime_codec.parse_time('23:59:59.5+01:00'))
+        assert_equals(time(23, 59, tzinfo=iso8601.UTC), datetime_codec.parse_time('23:59Z'))
+        assert_raises(ValueError, lambda: datetime_codec.parse_time('25:00:00'))
+
+    def test_can_parse_date(self):
+        assert_equals((2012, 2, 29, None), datetime_codec.parse_date('2012-02-29'))
+        assert_equals((2012, 2, 29, iso8601.UTC), datetime_codec.parse_date('2012-02-29Z'))
+        assert_equals(timedelta(hours=-2), datetime_codec.parse_date('2012-02-29-02')[3].utcoffset(None))
+        assert_raises(ValueError, lambda: datetime_codec.parse_date('2012-2-29'))
+
+
+class FormatTest(PythonicTestCase):
+    def test_can_format_values(self):
+        tz = iso8601.FixedOffset(-4, -30, 'dummy zone')
+        assert_equals('0099-01-02', datetime_codec.format_date(date(99, 1, 2)))
+        assert_equals('2012-01-02-04:30', datetime_codec.format_date(XSDDate(2012, 1, 2, tzinfo=tz)))
+        assert_equals('2012-01-02T03:04:05', datetime_codec.format_datetime(datetime(2012, 1, 2, 3, 4, 5, 6)))
+        assert_equals('2012-01-02T03:04:05+00:00',
+                      datetime_codec.format_datetime(datetime(2012, 1, 2, 3, 4, 5, tzinfo=iso8601.UTC)))
+        assert_equals('03:04:05-04:30', datetime_codec.format_time(time(3, 4, 5, tzinfo=tz)))
@@ -3,6 +3,9 @@ from __future__ import absolute_import
 import unittest
 from datetime import datetime
 
+import mock
+
+from soapfish import soap_dispatch
 from soapfish.flask_ import flask_dispatcher
 from soapfish.testutil import echo_service, framework
 
@@ -34,3 +37,15 @@ class FlaskDispatchTest(framework.DispatchTestMixin, unittest.TestCase):
         self.assertEquals(200, response.status_code)
         body = self._soap_response(response.data)
         self.assertEquals(input_value, body.value)
+
+    def test_uses_one_dispatcher_for_all_requests(self):
+        headers, body = self._soap_request('foo')
+        with mock.patch.object(soap_dispatch, 'SOAPDispatcher', wraps=soap_dispatch.SOAPDispatcher) as dispatcher:
+            app = flask.Flask(__name__)
+            app.add_url_rule('/ws/', 'ws', flask_dispatcher(self.service, lazy=True), methods=['POST'])
+            client = app.test_client()
+            self.assertEqual(0, dispatcher.call_count)
+            for _ in range(3):
+                response = client.post('/ws/', data=body, headers=headers)
+                self.assertEquals(200, response.status_code)
+        self.assertEqual(1, dispatcher.call_count)
@@ -0,0 +1,111 @@
+import functools
+import glob
+import os
+import sys
+import unittest
+
+from lxml import etree
+from pythonic_testcase import (
+    PythonicTestCase,
+    assert_equals,
+    assert_isinstance,
+    assert_not_contains,
+    assert_raises,
+    assert_true,
+)
+
+from soapfish import lazy, py2xsd, testutil, utils, wsdl2py, xsd, xsd2py
+
+
+@unittest.skipIf(sys.version_info < (3, 8), 'Lazy code generation requires Python 3.8')
+class LazyCodeGenerationTest(PythonicTestCase):
+
+    def test_defines_types_on_first_use(self):
+        xml = utils.open_document('tests/assets/generation/extension.xsd')
+        code = xsd2py.generate_code_from_xsd(xml, lazy=True)
+        with testutil.import_code(code) as generated:
+            assert_not_contains('Base', vars(generated))
+            assert_not_contains('ComplexType', vars(generated))
+
+            ComplexType = generated.ComplexType
+            assert_true(issubclass(ComplexType, generated.Base))
+            assert_equals(generated.Schema_a9b9f, ComplexType.SCHEMA)
+            assert_equals(['Field1', 'Field2'], [f._name for f in ComplexType._meta.fields])
+            with assert_raises(AttributeError):
+                generated.Unknown
+
+    def test_schema_resolves_types_on_demand(self):
+        xml = utils.open_document('tests/assets/generation/default.wsdl')
+        code = wsdl2py.generate_code_from_wsdl(xml, 'client', lazy=True)
+        with testutil.import_code(code) as generated:
+            schema = generated.PutOpsPortServiceStub.SERVICE.schemas[0]
+            assert_not_contains('Ops', vars(generated))
+
+            ops = schema.get_element_by_name('ops')
+            ops._evaluate_type()
+            assert_isinstance(ops._type, generated.Ops)
+            assert_not_contains('Status', vars(generated))
+
+            status = generated.Status.create(action='INSERTED', id=1)
+            xml = status.xml('status')
+            assert_equals(1, generated.Status.parsexml(xml).id)
+            assert_equals(4, len(schema.complexTypes))
+            assert_true(all(isinstance(t, type) for t in schema.complexTypes))
+
+    def test_generates_same_xsd_as_eager_code(self):
+        xml = utils.open_document('tests/assets/generation/default.xsd')
+        eager_schemas, symbols = testutil.generated_symbols(xsd2py.generate_code_from_xsd(xml))
+        with testutil.import_code(xsd2py.generate_code_from_xsd(xml, lazy=True)) as generated:
+            name = next(n for n in dir(generated) if n.startswith('Schema_'))
+            assert_not_contains(name, vars(generated))
+            schema = getattr(generated, name)
+            assert_isinstance(schema, xsd.Schema)
+            assert_equals(
+                etree.tostring(py2xsd.generate_xsd(eager_schemas[0])),
+                etree.tostring(py2xsd.generate_xsd(schema)),
+            )
+
+    def test_generates_same_xsd_as_eager_code_for_all_assets(self):
+        # The (eager) code for these assets can not be generated or imported.
+        unsupported = ('attribute_usage.xsd', 'implicit_namespace.xsd', 'import_remote.wsdl', 'inheritance.wsdl',
+                       'reference_simple.xsd')
+        for path in sorted(glob.glob('tests/assets/generation/*.*')):
+            if os.path.basename(path) in unsupported:
+                continue
+            xml = utils.open_document(path)
+            if path.endswith('.wsdl'):
+                generate = functools.partial(wsdl2py.generate_code_from_wsdl, xml, 'client', cwd=os.path.dirname(path))
+            else:
+                generate = functools.partial(xsd2py.generate_code_from_xsd, xml, cwd=os.path.dirname(path))
+            with testutil.import_code(generate()) as eager, testutil.import_code(generate(lazy=True)) as generated:
+                for name in [n for n in dir(eager) if n.startswith('Schema_')]:
+                    eager_xsd = etree.tostring(py2xsd.generate_xsd(getattr(eager, name)))
+                    assert_equals(eager_xsd, etree.tostring(py2xsd.generate_xsd(getattr(generated, name))),
+                                  message='%s: %s' % (path, name))
+
+    def test_keeps_anonymous_types_of_elements(self):
+        xml = utils.open_document('tests/assets/generation/reference_complex.xsd')
+        with testutil.import_code(xsd2py.generate_code_from_xsd(xml, lazy=True)) as generated:
+            schema = generated.Schema_ec204
+            py2xsd.schema_validator([schema])
+            person = schema.get_element_by_name('person')
+            person._evaluate_type()
+            assert_isinstance(person._type, generated.Person)
+
+    def test_keeps_rebound_schemas_apart(self):
+        for path in ('tests/assets/include/include.wsdl', 'tests/assets/same_namespace/same_namespace.wsdl'):
+            xml = utils.open_document(path)
+            eager_code = wsdl2py.generate_code_from_wsdl(xml, 'server', cwd=os.path.dirname(path))
+            lazy_code = wsdl2py.generate_code_from_wsdl(xml, 'server', cwd=os.path.dirname(path), lazy=True)
+            with testutil.import_code(eager_code) as eager, testutil.import_code(lazy_code) as generated:
+                names = [n for n in dir(eager) if n.startswith('Schema_')]
+                assert_equals(names, [n for n in dir(generated) if n.startswith('Schema_')])
+                for name in names:
+                    assert_equals(
+                        etree.tostring(py2xsd.generate_xsd(getattr(eager, name))),
+                        etree.tostring(py2xsd.generate_xsd(getattr(generated, name))),
+                    )
+
+    def test_rejects_redefined_classes(self):
+        with assert_raises(ValueError):
+            lazy.make_lazy('class A(object):\n    pass\n\n\nclass A(object):\n    pass\n')
@@ -0,0 +1,66 @@
+import threading
+
+import mock
+from lxml import etree
+from pythonic_testcase import (
+    PythonicTestCase,
+    assert_equals,
+    assert_none,
+    assert_raises,
+)
+
+from soapfish import parsers, xsd
+
+
+class Item(xsd.ComplexType):
+    name = xsd.Element(xsd.String)
+
+
+class ParsersTest(PythonicTestCase):
+
+    def test_reuses_parser_for_the_same_options(self):
+        parser = parsers.get_parser(huge_tree=True)
+        assert_equals(parser, parsers.get_parser(huge_tree=True))
+        self.assertIsNot(parser, parsers.get_parser())
+        self.assertIsNot(parser, parsers.get_parser(huge_tree=True, remove_blank_text=True))
+
+    def test_evicts_least_recently_used_parser(self):
+        with mock.patch.object(parsers, 'MAX_PARSERS', 2):
+            parsers._local.parsers = None
+            parser = parsers.get_parser(huge_tree=True)
+            other = parsers.get_parser(remove_comments=True)
+            assert_equals(parser, parsers.get_parser(huge_tree=True))
+            parsers.get_parser(remove_pis=True)  # evicts the other parser
+            assert_equals(parser, parsers.get_parser(huge_tree=True))
+            self.assertIsNot(other, parsers.get_parser(remove_comments=True))
+
+    def test_every_thread_has_its_own_parser(self):
+        other = []
+        thread = threading.Thread(target=lambda: other.append(parsers.get_parser()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(parsers.get_parser(), other[0])
+
+    def test_does_not_resolve_entities(self):
+        xml = b'<!DOCTYPE item [<!ENTITY e "secret">]><item><name>&e;</name></item>'
+        self.assertNotEqual('secret', parsers.fromstring(xml).findtext('name'))
+        assert_none(Item.parsexml(xml).name)
+
+    def test_can_pass_parser_options_to_parsexml(self):
+        xml = b'<item>\n  <name>a</name>\n</item>'
+        assert_equals('\n  ', Item.parsexml(xml)._xmlelement.text)
+        assert_none(Item.parsexml(xml, parser_options={'remove_blank_text': True})._xmlelement.text)
+
+    def test_can_validate_with_schema_bound_parser(self):
+        schema = etree.XMLSchema(etree.fromstring(b'''
+            <xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+                <xs:element name="item">
+                    <xs:complexType>
+                        <xs:sequence><xs:element name="name" type="xs:string"/></xs:sequence>
+                    </xs:complexType>
+                </xs:element>
+            </xs:schema>'''))
+        assert_equals('a', Item.parsexml(b'<item><name>a</name></item>', schema=schema).name)
+        with assert_raises(etree.XMLSyntaxError):
+            Item.parsexml(b'<item><other/></item>', schema=schema)
+        assert_equals(parsers.get_parser(schema), parsers.get_parser(schema))
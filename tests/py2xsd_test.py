@@ -2,10 +2,10 @@
 from __future__ import absolute_import, unicode_literals
 
 from lxml import etree
-from pythonic_testcase import PythonicTestCase, assert_false, assert_true
+from pythonic_testcase import PythonicTestCase, assert_equals, assert_false, assert_true
 
 from soapfish import xsd
-from soapfish.py2xsd import generate_xsd
+from soapfish.py2xsd import generate_xsd, get_xml_schema
 
 
 class py2xsdTest(PythonicTestCase):
@@ -35,3 +35,19 @@ class py2xsdTest(PythonicTestCase):
 
         bad_xml = '<foo xmlns="%s"><code>abc</code></foo>' % ns
         assert_false(is_valid(bad_xml))
+
+    def test_caches_compiled_schema_until_schema_changes(self):
+        ns = 'http://soap.example/cache.xsd'
+
+        class Container(xsd.ComplexType):
+            code = xsd.Element(xsd.String)
+        schema = xsd.Schema(ns, elementFormDefault=xsd.ElementFormDefault.QUALIFIED,
+                            complexTypes=[Container], elements={'foo': xsd.Element(Container)})
+        xmlschema = get_xml_schema(schema)
+        assert_equals(xmlschema, get_xml_schema(schema))
+        xml = '<bar xmlns="%s"><code>1</code></bar>' % ns
+        assert_false(xmlschema.validate(etree.fromstring(xml)))
+
+        schema.elements['bar'] = schema.elements['foo']
+        self.assertIsNot(xmlschema, get_xml_schema(schema))
+        assert_true(get_xml_schema(schema).validate(etree.fromstring(xml)))
@@ -1,5 +1,8 @@
 from __future__ import absolute_import
 
+import threading
+
+import mock
 import six
 from lxml import etree
 from pythonic_testcase import (
@@ -14,16 +17,17 @@ from pythonic_testcase import (
     assert_true,
 )
 
-from soapfish import wsa, xsd
+from soapfish import soap11, xsd
 from soapfish.core import SOAPError, SOAPRequest, SOAPResponse
 from soapfish.middlewares import ExceptionToSoapFault
-from soapfish.soap_dispatch import SOAPDispatcher
+from soapfish.soap_dispatch import SOAPDispatcher, ValidationPolicy
 from soapfish.testutil import (
     EchoInputHeader,
     EchoOutputHeader,
     echo_handler,
     echo_service,
 )
+from soapfish.testutil.echo_service import EchoType
 
 
 class SOAPDispatcherTest(PythonicTestCase):
@@ -120,6 +124,29 @@ class SOAPDispatcherTest(PythonicTestCase):
         assert_equals('text/xml', response.http_headers['Content-Type'])
         self.assert_is_soap_fault(response, partial_fault_string=u'Missing SOAP body')
 
+    def test_can_reject_empty_soap_body(self):
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), self._wrap_with_soap_envelope(''))
+        response = SOAPDispatcher(echo_service()).dispatch(request)
+        self.assert_is_soap_fault(response, partial_fault_string=u'Missing SOAP body content')
+
+    def test_parses_only_the_body_content(self):
+        handler, handler_state = echo_handler()
+        dispatcher = SOAPDispatcher(echo_service(handler))
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<value>foobar</value>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+        with mock.patch.object(soap11.Envelope, 'parse_xmlelement') as parse_envelope, \
+                mock.patch.object(soap11.Body, 'parse_xmlelement') as parse_body:
+            response = dispatcher.dispatch(request)
+        self.assert_is_successful_response(response, handler_state)
+        assert_equals('foobar', handler_state.input_.value)
+        assert_false(parse_envelope.called)
+        assert_false(parse_body.called)
+
     def test_can_reject_invalid_action(self):
         soap_message = (
             '<ns1:echoRequest xmlns:ns1="http://soap.example/echo/types">'
@@ -153,6 +180,39 @@ class SOAPDispatcherTest(PythonicTestCase):
         response = dispatcher.dispatch(request)
         self.assert_is_successful_response(response, handler_state)
 
+    def test_can_dispatch_requests_based_on_substitution_group(self):
+        handler, handler_state = echo_handler()
+        service = echo_service(handler)
+        schema = service.schemas[0]
+        schema.elements['echoAlias'] = xsd.Element(schema.elements['echoRequest']._type.__class__,
+                                                   namespace=schema.targetNamespace,
+                                                   substitutionGroup='echoRequest')
+        dispatcher = SOAPDispatcher(service)
+        soap_message = (
+            '<ns1:echoAlias xmlns:ns1="http://soap.example/echo/types">'
+            '<value>foobar</value>'
+            '</ns1:echoAlias>'
+        )
+        request = SOAPRequest(dict(REQUEST_METHOD='POST'), self._wrap_with_soap_envelope(soap_message))
+        response = dispatcher.dispatch(request)
+        self.assert_is_successful_response(response, handler_state)
+        assert_equals('foobar', handler_state.input_.value)
+
+    def test_routes_by_qualified_root_tag(self):
+        service = echo_service()
+        method = service.methods[0]
+        other = xsd.Method(function=method.function, soapAction='other', input='echoRequest',
+                           output='echoResponse', operationName='otherOperation')
+        service.methods.insert(0, other)
+        dispatcher = SOAPDispatcher(service)
+        body = etree.Element('{http://soap.example/echo/types}echoRequest')
+        request = SOAPRequest(dict(REQUEST_METHOD='POST'), '')
+        assert_equals(other, dispatcher._find_handler_for_request(request, body))
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), '')
+        assert_equals(method, dispatcher._find_handler_for_request(request, body))
+        assert_equals(method, service.get_method('echoOperation'))
+        assert_equals(other, service.get_method('otherOperation'))
+
     def test_can_use_soap_error_from_handler(self):
         soap_error = SOAPError('code', 'internal data error', 'actor')
 
@@ -190,6 +250,25 @@ class SOAPDispatcherTest(PythonicTestCase):
             body_text = body_text.decode('utf-8')
         assert_contains('<value>hello</value>', body_text)
 
+    def test_can_parse_request_without_keeping_xml(self):
+        handler, handler_state = echo_handler()
+        dispatcher = SOAPDispatcher(echo_service(handler, input_header=EchoInputHeader), keep_xmlelement=False)
+        soap_header = ('<tns:InputVersion>42</tns:InputVersion>')
+        soap_message = (
+            '<tns:echoRequest>'
+            '<value>foobar</value>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message, header=soap_header)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+
+        response = dispatcher.dispatch(request)
+        self.assert_is_successful_response(response, handler_state)
+        assert_equals('foobar', handler_state.input_.value)
+        assert_false(hasattr(handler_state.input_, '_xmlelement'))
+        assert_equals('42', handler_state.input_header.InputVersion)
+        assert_false(hasattr(handler_state.input_header, '_xmlelement'))
+
     def test_can_propagate_custom_input_header(self):
         handler, handler_state = echo_handler()
         dispatcher = SOAPDispatcher(echo_service(handler, input_header=EchoInputHeader))
@@ -284,16 +363,130 @@ class SOAPDispatcherTest(PythonicTestCase):
         assert_equals('text/xml', response.http_headers['Content-Type'])
         assert_equals(500, response.http_status_code)
 
+    def test_composes_middlewares_only_when_changed(self):
+        calls = []
+
+        def middleware(request, next_call):
+            calls.append(request.method)
+            return next_call(request)
+        dispatcher = SOAPDispatcher(echo_service(), [ExceptionToSoapFault()])
+        chain = dispatcher.middleware()
+        assert_equals(chain, dispatcher.middleware())
+
+        dispatcher.middlewares.append(middleware)
+        self.assertIsNot(chain, dispatcher.middleware())
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<value>foo</value>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+        self.assert_is_successful_response(dispatcher.dispatch(request))
+        assert_length(1, calls)
+
+    def test_calls_operation_middlewares_only_for_their_operations(self):
+        calls = []
+
+        def echo_middleware(request, next_call):
+            calls.append(('echo', request.soap_body.value))
+            return next_call(request)
+        echo_middleware.operations = ['echoOperation']
+
+        def other_middleware(request, next_call):
+            calls.append(('other', request.soap_body.value))
+            return next_call(request)
+        other_middleware.operations = ['otherOperation']
+
+        dispatcher = SOAPDispatcher(echo_service(), [other_middleware, echo_middleware])
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<value>foo</value>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+        self.assert_is_successful_response(dispatcher.dispatch(request))
+        assert_equals([('echo', 'foo')], calls)
+
+    def test_can_skip_request_validation(self):
+        handler, handler_state = echo_handler()
+        policy = ValidationPolicy(requests=ValidationPolicy.OFF)
+        dispatcher = SOAPDispatcher(echo_service(handler), validation=policy)
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<value>foo</value><invalid>bar</invalid>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+        self.assert_is_successful_response(dispatcher.dispatch(request), handler_state)
+        assert_equals('foo', handler_state.input_.value)
+        assert_equals({'requests_skipped': 1, 'responses_skipped': 1}, dict(policy.counters))
+
+    def test_can_sample_request_validation(self):
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<invalid>bar</invalid>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        for sample_rate, validated in ((0, 0), (1, 1)):
+            policy = ValidationPolicy(requests=ValidationPolicy.SAMPLED, sample_rate=sample_rate)
+            dispatcher = SOAPDispatcher(echo_service(), [ExceptionToSoapFault()], validation=policy)
+            request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+            dispatcher.dispatch(request)
+            assert_equals(validated, policy.counters['requests_validated'])
+            assert_equals(validated, policy.counters['request_failures'])
+            assert_equals(1 - validated, policy.counters['requests_skipped'])
+        assert_raises(ValueError, lambda: ValidationPolicy(requests='sometimes'))
+        assert_raises(ValueError, lambda: ValidationPolicy(sample_rate=1.5))
+        assert_raises(ValueError, lambda: ValidationPolicy(sample_rate=-0.1))
+
+    def test_can_use_validation_policy_per_operation(self):
+        policy = ValidationPolicy(requests=ValidationPolicy.OFF)
+        dispatcher = SOAPDispatcher(echo_service(), operation_validation={'echoOperation': policy})
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<value>foo</value>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+        self.assert_is_successful_response(dispatcher.dispatch(request))
+        assert_equals(1, policy.counters['requests_skipped'])
+        assert_equals({}, dict(dispatcher.validation.counters))
+
+    def test_can_reject_invalid_response(self):
+        def handler(request, input_):
+            response = SOAPResponse(EchoType())
+            response.soap_header = EchoOutputHeader(OutputVersion='42')
+            return response
+        policy = ValidationPolicy(responses=ValidationPolicy.STRICT)
+        dispatcher = SOAPDispatcher(echo_service(handler, output_header=EchoOutputHeader), validation=policy)
+        soap_message = (
+            '<tns:echoRequest xmlns:tns="http://soap.example/echo/types">'
+            '<value>foo</value>'
+            '</tns:echoRequest>'
+        )
+        request_message = self._wrap_with_soap_envelope(soap_message)
+        request = SOAPRequest(dict(SOAPACTION='echo', REQUEST_METHOD='POST'), request_message)
+        response = dispatcher.dispatch(request)
+        self.assert_is_soap_fault(response, fault_code='Server', partial_fault_string='Invalid response')
+        assert_contains(b'<ns0:OutputVersion>42</ns0:OutputVersion>', response.http_content)
+        assert_equals(1, policy.counters['responses_validated'])
+        assert_equals(1, policy.counters['response_failures'])
+
     def test_can_validate_wsa_header(self):
         dispatcher = SOAPDispatcher(echo_service())
-        header = wsa.Header.parsexml(
+        header = etree.fromstring(
             '<Header><Action xmlns="http://www.w3.org/2005/08/addressing">/Action</Action></Header>'
         )
         dispatcher._validate_header(header)
 
     def test_can_detect_invalid_wsa_header(self):
         dispatcher = SOAPDispatcher(echo_service())
-        header = wsa.Header.parsexml(
+        header = etree.fromstring(
             '<Header><Invalid xmlns="http://www.w3.org/2005/08/addressing">/Action</Invalid></Header>'
         )
         assert_raises(etree.DocumentInvalid, lambda: dispatcher._validate_header(header))
@@ -371,6 +564,37 @@ class SOAPDispatcherTest(PythonicTestCase):
         response = dispatcher.dispatch(request)
         self.assertEqual(response.http_status_code, 999)
 
+    def test_can_dispatch_requests_from_several_threads(self):
+        dispatcher = SOAPDispatcher(echo_service())
+        start = threading.Event()
+        failures = []
+
+        def dispatch_requests(thread_id):
+            start.wait()
+            for i in range(50):
+                value = 'thread %d request %d' % (thread_id, i)
+                tag = 'value' if i % 5 else 'invalid'
+                message = '<tns:echoRequest><%s>%s</%s></tns:echoRequest>' % (tag, value, tag)
+                request = SOAPRequest({'REQUEST_METHOD': 'POST', 'SOAPACTION': 'echo'},
+                                      self._wrap_with_soap_envelope(message))
+                try:
+                    response = dispatcher.dispatch(request)
+                    if tag == 'value':
+                        self.assert_is_successful_response(response)
+                        assert_contains(('<value>%s</value>' % value).encode('utf-8'), response.http_content)
+                    else:
+                        self.assert_is_soap_fault(response, partial_fault_string="Element 'invalid'")
+                except Exception as e:
+                    failures.append((value, e))
+
+        threads = [threading.Thread(target=dispatch_requests, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        assert_equals([], failures)
+
     # --- custom assertions ---------------------------------------------------
 
     def assert_is_successful_response(self, response, handler_state=None):
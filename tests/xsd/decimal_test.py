@@ -9,3 +9,23 @@ class DecimalTest(SimpleTypeTestCase):
         self.xsd_type = xsd.Decimal(pattern='1.')
         self.assert_can_set(12)
         self.assert_can_not_set(123)
+
+    def test_digits_of_integers(self):
+        self.xsd_type = xsd.Integer(totalDigits=2)
+        self.assert_can_set(99)
+        self.assert_can_set(-9)
+        self.assert_can_not_set(100)
+        self.assert_can_not_set(-10)  # the sign counts as a digit
+
+        self.xsd_type = xsd.Decimal(fractionDigits=2, totalDigits=3)
+        self.assert_can_set(1.25)
+        self.assert_can_not_set(1.5)
+        self.assert_can_not_set(10.25)
+        self.assert_can_not_set(125)
+
+    def test_integer_pattern(self):
+        self.xsd_type = xsd.Integer(pattern=r'1\d')
+        self.assert_can_set(-1)  # the pattern of Integer overrides the given one
+        self.xsd_type = xsd.Decimal(pattern=r'-?1\d')
+        self.assert_can_set(-12)
+        self.assert_can_not_set(True)
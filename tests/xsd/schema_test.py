@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from pythonic_testcase import PythonicTestCase, assert_equals, assert_none
+from pythonic_testcase import PythonicTestCase, assert_equals, assert_none, assert_true
 
 from soapfish import xsd
 
@@ -21,3 +21,27 @@ class SchemaTest(PythonicTestCase):
         assert_equals(CodeType, schema_element._passed_type)
 
         assert_none(schema.get_element_by_name('invalid'))
+
+    def test_freeze_resolves_all_element_types(self):
+        class Code(xsd.String):
+            pattern = r'[0-9]{5}'
+
+        class Address(xsd.ComplexType):
+            code = xsd.Element(Code)
+            number = xsd.Attribute('soapfish.xsd.Integer')
+
+        class Person(xsd.ComplexType):
+            address = xsd.Element(Address)
+            nicknames = xsd.ListElement(xsd.String, 'nickname')
+
+        schema = xsd.Schema('http://soap.example/schema.xsd',
+                            elements={'person': xsd.Element(Person)})
+        assert_none(Address.code._type)
+        assert_equals(schema, schema.freeze())
+        assert_true(schema.frozen)
+        assert_true(isinstance(Address.code._type, Code))
+        assert_true(isinstance(Address.number._type, xsd.Integer))
+        assert_true(isinstance(Person.nicknames._type, xsd.String))
+        assert_true('code' in Address._meta.tag_index)
+        # facets are compiled for the instance (not looked up on first use)
+        assert_true('_check_facets' in vars(Address.code._type))
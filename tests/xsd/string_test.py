@@ -33,6 +33,14 @@ class StringTest(SimpleTypeTestCase):
         assert_raises(ValueError, lambda: xsd_string.accept('15'))
         assert_raises(ValueError, lambda: xsd_string.accept('20'))
 
+    def test_facets_are_compiled_once(self):
+        xsd_string = xsd.String(enumeration=['a', 'b'], pattern='[a-z]')
+        assert_equals('a', xsd_string.accept('a'))
+        check_facets = xsd_string._check_facets
+        assert_equals('b', xsd_string.accept('b'))
+        assert_equals(check_facets, xsd_string._check_facets)
+        assert_raises(ValueError, lambda: xsd_string.accept('c'))
+
     def test_accepts_plain_strings_even_if_subclassed(self):
         class StringWithPattern(xsd.String):
             pattern = r'[0-9]{3}'
@@ -61,6 +69,11 @@ class StringTest(SimpleTypeTestCase):
         value = xsd_string.accept(value)
         assert_equals(expected, value)
 
+    def test_parsing_applies_whitespace_restriction(self):
+        xsd_string = xsd.String(whiteSpace='collapse')
+        assert_equals('line 1 line 2', xsd_string.pythonvalue('line  1\n \tline  2'))
+        assert_equals(None, xsd_string.pythonvalue(None))
+
     def test_apply_whitespace_restriction_before_validation(self):
         self.xsd_type = xsd.String(minLength=4, whiteSpace='collapse')
         self.assert_can_not_set('1\n  \t 2')
@@ -1,6 +1,9 @@
 
+import copy
+import pickle
 import unittest
 from decimal import Decimal
+from io import BytesIO
 
 import iso8601
 from lxml import etree
@@ -103,6 +106,23 @@ class ElementTest(unittest.TestCase):
         flight = Flight(takeoff_airport=Airport())
         str(flight)
 
+    def test_construction_applies_defaults(self):
+        class Test(xsd.ComplexType):
+            kind = xsd.Attribute(xsd.String(enumeration=['A', 'B']), default='A')
+            name = xsd.Element(xsd.String)
+            items = xsd.ListElement(xsd.String, 'item')
+
+        test = Test(name='foo')
+        assert_equals('A', test.kind)
+        assert_equals('foo', test.name)
+        assert_equals([], test.items)
+        assert_equals(Test.name, Test._meta.by_name['name'])
+
+    def test_setting_unknown_field(self):
+        airport = Airport()
+        with assert_raises(ValueError):
+            airport.unknown = 'foo'
+
 
 class ListElementTest(unittest.TestCase):
 
@@ -142,6 +162,34 @@ class ListElementTest(unittest.TestCase):
         l.append('a')
         l.append('a')
 
+    def test_extend(self):
+        element = xsd.ListElement(xsd.Integer, maxOccurs=3, nillable=True, tagname='toto')
+        items = element.empty_value()
+        items.extend(['1', xsd.NIL])
+        assert_equals([1, xsd.NIL], items)
+        items += (3,)
+        assert_equals([1, xsd.NIL, 3], items)
+        assert_equals([1, 2], xsd.TypedList(element, ['1', '2']))
+
+    def test_extend_adds_all_or_no_items(self):
+        items = xsd.ListElement(xsd.Integer, maxOccurs=3, tagname='toto').empty_value()
+        items.append(1)
+        e = assert_raises(ValueError, lambda: items.extend([2, 3, 4]))
+        assert_equals('You must not add more than 3 items to this list.', str(e))
+        assert_raises(ValueError, lambda: items.extend([2, 'invalid']))
+        assert_raises(ValueError, lambda: items.extend([2, xsd.NIL]))
+        assert_equals([1], items)
+
+    def test_parsing_validates_all_items(self):
+        class Test(xsd.ComplexType):
+            values = xsd.ListElement(xsd.Int, 'value', maxOccurs=2)
+            name = xsd.Element(xsd.String)
+        test = Test.parsexml('<test><value>1</value><name>a</name><value>2</value></test>')
+        assert_equals([1, 2], test.values)
+        self.assertTrue(isinstance(test.values, xsd.TypedList))
+        XML = '<test><value>1</value><value>2</value><value>3</value></test>'
+        assert_raises(ValueError, lambda: Test.parsexml(XML))
+
 
 class BooleanTypeTest(unittest.TestCase):
 
@@ -480,6 +528,24 @@ class ComplexTest(unittest.TestCase):
 '''
         self.assertEqual(expected_xml, xml)
 
+    def test_render_plan_is_cached(self):
+        plan = Airport._meta.render_plan('http://airport.example', xsd.ElementFormDefault.QUALIFIED)
+        assert_equals(['type', 'code'], [name for name, _ in plan])
+        assert_equals(True, plan is Airport._meta.render_plan('http://airport.example',
+                                                              xsd.ElementFormDefault.QUALIFIED))
+        assert_equals(False, plan is Airport._meta.render_plan(None, None))
+
+    def test_rendering_uses_custom_element_render(self):
+        class UpperElement(xsd.Element):
+            def render(self, parent, field_name, value, namespace=None, elementFormDefault=None):
+                super(UpperElement, self).render(parent, field_name, value.upper(), namespace, elementFormDefault)
+
+        class Test(xsd.ComplexType):
+            name = UpperElement(xsd.String)
+
+        xml = Test(name='foo').xml('test', pretty_print=False)
+        assert_equals(b'<test><name>FOO</name></test>', xml)
+
     def test_inheritance_rendering(self):
 
         class A(xsd.ComplexType):
@@ -510,6 +576,29 @@ class ComplexTest(unittest.TestCase):
         self.assertEqual(b.name, 'b')
         self.assertEqual(b.type, 'B')
 
+    def test_inherited_fields(self):
+        class A(xsd.ComplexType):
+            name = xsd.Attribute(xsd.String)
+            code = xsd.Element(xsd.String)
+            comment = xsd.Element(xsd.String)
+
+        class Mixin(xsd.ComplexType):
+            extra = xsd.Element(xsd.Integer)
+
+        class B(A):
+            code = xsd.Element(xsd.Integer)
+            comment = None  # not a field anymore
+            type = xsd.Element(xsd.String)
+
+        class C(B, Mixin):
+            pass
+
+        assert_equals(('name', 'code', 'type'), B._meta.names)
+        assert_equals(xsd.Integer, B._meta.by_name['code']._passed_type)
+        assert_equals([A.name], B._meta.attributes)
+        assert_equals(('name', 'extra', 'code', 'type'), C._meta.names)
+        assert_equals([Mixin.extra, B.code, B.type], C._meta.fields)
+
     def test_parsexml_with_soapfish_schema(self):
         # sometimes it comes handy that soapfish can validate some XML against a
         # provided soapfish schema (instead of an etree.XMLSchema) especially in
@@ -579,6 +668,107 @@ class XMLParsingTest(unittest.TestCase):
         self.assertEqual('ICAO', flight.landing_airport.type)
         self.assertEqual(['abc', '123'], flight.passengers)
 
+    def test_parsing_without_keeping_xmlelement(self):
+        flight = Flight.parsexml(self.LIST_XML, keep_xmlelement=False)
+        self.assertFalse(hasattr(flight, '_xmlelement'))
+        self.assertFalse(hasattr(flight.takeoff_airport, '_xmlelement'))
+        self.assertEqual('WAW', flight.takeoff_airport.code)
+        self.assertEqual(['abc', '123'], flight.passengers)
+
+        self.assertEqual(Flight.parsexml(self.LIST_XML), flight)
+        self.assertEqual(hash(Flight.parsexml(self.LIST_XML)), hash(flight))
+        self.assertNotEqual(Flight.parsexml(self.SIMPLE_XML, keep_xmlelement=False), flight)
+
+    def test_lazy_parsing(self):
+        flight = Flight.parsexml(self.LIST_XML, lazy=True)
+        self.assertNotIn('tail_number', vars(flight))
+        self.assertNotIn('passengers', vars(flight))
+        self.assertEqual(None, flight.takeoff_datetime)
+        self.assertEqual('LN-KKA', flight.tail_number)
+        self.assertIn('tail_number', vars(flight))
+
+        airport = flight.takeoff_airport
+        self.assertNotIn('code', vars(airport))
+        self.assertEqual('WAW', airport.code)
+        self.assertEqual(['abc', '123'], flight.passengers)
+        flight.passengers.append('xyz')
+        self.assertEqual(['abc', '123', 'xyz'], flight.passengers)
+
+        self.assertEqual(Flight.parsexml(self.LIST_XML), Flight.parsexml(self.LIST_XML, lazy=True))
+        with self.assertRaises(AttributeError):
+            flight.unknown
+
+    def test_lazy_parsing_drops_parsed_elements(self):
+        flight = Flight.parsexml(self.LIST_XML, lazy=True, keep_xmlelement=False)
+        clone = copy.copy(flight)
+        names = list(flight._lazy[0])
+        for name in names[:-1]:
+            getattr(flight, name)
+            self.assertNotIn(name, flight._lazy[0])
+        getattr(flight, names[-1])
+        self.assertEqual(None, flight._lazy)
+        self.assertEqual(flight, clone)
+
+    def test_lazy_parsing_keeps_assigned_values(self):
+        flight = Flight.parsexml(self.LIST_XML, lazy=True)
+        flight.tail_number = 'LN-KKB'
+        self.assertNotIn('tail_number', flight._lazy[0])
+        self.assertEqual('LN-KKB', copy.copy(flight).tail_number)
+        self.assertEqual('LN-KKB', flight.tail_number)
+
+    def test_trusted_parsing(self):
+        class Code(xsd.ComplexType):
+            code = xsd.Attribute(xsd.String(pattern=r'[A-Z]+'))
+            number = xsd.Element(xsd.Integer(maxInclusive=10))
+            values = xsd.ListElement(xsd.String, 'value', maxOccurs=1)
+
+        xml = b'<code code="abc"><number>11</number><value>a</value><value>b</value></code>'
+        with self.assertRaises(ValueError):
+            Code.parsexml(xml)
+        code = Code.parsexml(xml, trusted=True)
+        self.assertEqual('abc', code.code)
+        self.assertEqual(11, code.number)
+        self.assertEqual(['a', 'b'], code.values)
+        # the public conversion checks the facets
+        with self.assertRaises(ValueError):
+            xsd.Integer(maxInclusive=10).pythonvalue('11')
+        self.assertEqual(1.5, xsd.Decimal(maxInclusive=10).pythonvalue('1.5'))
+
+    def test_parses_list_items_with_overridden_parse(self):
+        class UpperListElement(xsd.ListElement):
+            def parse(self, instance, field_name, xmlelement, **options):
+                getattr(instance, field_name).append(xmlelement.text.upper())
+
+        class Names(xsd.ComplexType):
+            names = UpperListElement(xsd.String, 'name')
+
+        xml = b'<names><name>a</name><name>b</name></names>'
+        self.assertEqual(['A', 'B'], Names.parsexml(xml).names)
+        self.assertEqual(['A', 'B'], Names.parsexml(xml, lazy=True).names)
+
+    def test_parsing_ignores_namespaces_and_comments(self):
+        xml = b'''<ns:flight xmlns:ns="http://flight.example">
+  <!-- a comment -->
+  <ns:passenger>abc</ns:passenger>
+  <ns:tail_number>LN-KKA</ns:tail_number>
+  <passenger>123</passenger>
+</ns:flight>
+'''
+        flight = Flight.parse_xmlelement(etree.fromstring(xml))
+        self.assertEqual('LN-KKA', flight.tail_number)
+        self.assertEqual(['abc', '123'], flight.passengers)
+
+    def test_tag_index(self):
+        fields, refs = Flight._meta.lookup_tag('passenger')
+        self.assertEqual((Flight.passengers, ), fields)
+        self.assertEqual((), refs)
+        self.assertEqual(fields, Flight._meta.lookup_tag('{http://flight.example}passenger')[0])
+        self.assertEqual(((), ()), Flight._meta.lookup_tag('unknown'))
+
+        fields, refs = Operation._meta.lookup_tag('input')
+        self.assertEqual((), fields)
+        self.assertEqual((Operation.requestResponseOperation, ), refs)
+
 
 class XSD_Spec_Test(unittest.TestCase):
     AIRPORT_XML = '''
@@ -947,5 +1137,284 @@ class MaxOccursTest(unittest.TestCase):
         self.assertEqual(xsd.UNBOUNDED, value)
 
 
+class EqualityTest(unittest.TestCase):
+
+    def _flight(self, tail_number='LN-KKA', passengers=('abc', '123')):
+        flight = Flight(tail_number=tail_number, takeoff_airport=Airport.create('IATA', 'WAW'))
+        for passenger in passengers:
+            flight.passengers.append(passenger)
+        return flight
+
+    def test_equality_and_hash_use_field_values(self):
+        assert_equals(self._flight(), self._flight())
+        assert_equals(hash(self._flight()), hash(self._flight()))
+        self.assertNotEqual(self._flight(), self._flight(tail_number='LN-KKB'))
+        self.assertNotEqual(self._flight(), self._flight(passengers=['abc']))
+        self.assertNotEqual(Airport.create('IATA', 'WAW'), Aircraft())
+        assert_equals(2, len({self._flight(), self._flight(), self._flight(tail_number='LN-KKB')}))
+
+    def test_ordering(self):
+        flights = [self._flight('LN-KKC'), self._flight('LN-KKA'), self._flight('LN-KKB')]
+        assert_equals(['LN-KKA', 'LN-KKB', 'LN-KKC'], [f.tail_number for f in sorted(flights)])
+        self.assertTrue(Airport.create('IATA', None) < Airport.create('IATA', 'WAW'))
+
+    def test_freeze(self):
+        flight = self._flight().freeze()
+        assert_equals(('abc', '123'), flight.passengers)
+        with assert_raises(AttributeError):
+            flight.tail_number = 'LN-KKB'
+        with assert_raises(AttributeError):
+            flight.takeoff_airport.code = 'EGLL'
+        assert_equals(self._flight(), flight)
+        assert_equals(hash(self._flight()), hash(flight))
+        assert_equals(b'<flight><tail_number>LN-KKA</tail_number><takeoff_airport><type>IATA</type>'
+                      b'<code>WAW</code></takeoff_airport><passenger>abc</passenger><passenger>123</passenger>'
+                      b'</flight>', flight.xml('flight', pretty_print=False))
+
+    def test_freeze_compact_instance(self):
+        line = CompactLine(number=1, sku='A-1').freeze()
+        with assert_raises(AttributeError):
+            line.sku = 'B-2'
+        assert_equals(CompactLine(number=1, sku='A-1'), line)
+
+
+class CompactLine(xsd.ComplexType):
+    COMPACT = True
+    number = xsd.Attribute(xsd.Integer)
+    sku = xsd.Element(xsd.String)
+
+
+class CompactOrder(xsd.ComplexType):
+    COMPACT = True
+    lines = xsd.ListElement(CompactLine, 'line')
+
+
+class CompactTest(unittest.TestCase):
+    XML = b'''<order>
+  <line number="1">
+    <sku>A-1</sku>
+  </line>
+  <line number="2">
+    <sku>B-2</sku>
+  </line>
+</order>\n'''
+
+    def test_instances_have_no_dict(self):
+        line = CompactLine(number=1, sku='A-1')
+        assert_equals(False, hasattr(line, '__dict__'))
+        assert_equals(1, line.number)
+        assert_equals('A-1', line.sku)
+        assert_equals(['number', 'sku'], [f._name for f in CompactLine._meta.all])
+        with assert_raises(ValueError):
+            line.number = 'foo'
+
+    def test_parsing_and_rendering(self):
+        order = CompactOrder.parsexml(self.XML)
+        assert_equals(['A-1', 'B-2'], [line.sku for line in order.lines])
+        assert_equals([1, 2], [line.number for line in order.lines])
+        assert_equals(self.XML, order.xml('order'))
+
+    def test_lazy_parsing(self):
+        order = CompactOrder.parsexml(self.XML, lazy=True)
+        line = order.lines[1]
+        assert_equals(2, line.number)
+        assert_equals('B-2', line.sku)
+        assert_equals(CompactOrder.parsexml(self.XML), order)
+        assert_equals(self.XML, CompactOrder.parsexml(self.XML, lazy=True).xml('order'))
+
+    def test_inheritance(self):
+        class ExtendedLine(CompactLine):
+            note = xsd.Element(xsd.String, minOccurs=0)
+
+        line = ExtendedLine(number=3, sku='C-3', note='foo')
+        assert_equals(False, hasattr(line, '__dict__'))
+        assert_equals(['number', 'sku', 'note'], [f._name for f in ExtendedLine._meta.all])
+        assert_equals(b'<line number="3"><sku>C-3</sku><note>foo</note></line>', line.xml('line', pretty_print=False))
+
+    def test_copy_and_pickle(self):
+        order = CompactOrder.parsexml(self.XML, keep_xmlelement=False)
+        for clone in (copy.copy(order), copy.deepcopy(order), pickle.loads(pickle.dumps(order))):
+            assert_equals(order, clone)
+            self.assertIsNot(order, clone)
+        line = CompactLine(number=1, sku='A-1').freeze()
+        for clone in (copy.copy(line), copy.deepcopy(line), pickle.loads(pickle.dumps(line))):
+            assert_equals(line, clone)
+            assert_equals(hash(line), hash(clone))
+            with assert_raises(AttributeError):
+                clone.sku = 'B-2'
+
+    def test_group_reference(self):
+        class Person(xsd.Group):
+            COMPACT = True
+            name = xsd.Element(xsd.String)
+
+        class Job(xsd.ComplexType):
+            COMPACT = True
+            title = xsd.Element(xsd.String)
+            person = xsd.Ref(Person)
+
+        job = Job(title='Programmer')
+        job.person.name = 'An'
+        assert_equals(b'<job><title>Programmer</title><name>An</name></job>', job.xml('job', pretty_print=False))
+        assert_equals('An', Job.parsexml(job.xml('job')).person.name)
+
+
+class CompactShipment(xsd.ComplexType):
+    COMPACT = True
+    id = xsd.Element(xsd.String)
+    order = xsd.Element(CompactOrder)
+
+
+class IterparseTest(unittest.TestCase):
+    XML = b'''<shipment>
+  <id>7</id>
+  <order>
+    <!-- a comment -->
+    <line number="1"><sku>A-1</sku></line>
+    <other><line number="0"><sku>X</sku></line></other>
+    <line number="2"><sku>B-2</sku></line>
+    <line number="3" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:nil="true"/>
+  </order>
+</shipment>
+'''
+
+    def test_iterparse(self):
+        lines = CompactShipment.iterparse(BytesIO(self.XML), 'order.lines')
+        line = next(lines)
+        assert_equals(CompactLine(number=1, sku='A-1'), line)
+        assert_equals(False, hasattr(line, '_xmlelement'))
+        assert_equals([CompactLine(number=2, sku='B-2'), xsd.NIL], list(lines))
+
+        flight = BytesIO(XMLParsingTest.LIST_XML)
+        assert_equals(['abc', '123'], list(Flight.iterparse(flight, 'passengers')))
+
+    def test_iterparse_clears_parsed_elements(self):
+        class Recorder(CompactLine):
+            @classmethod
+            def parse_xmlelement(cls, xmlelement, **options):
+                previous.append([len(e) for e in xmlelement.itersiblings(preceding=True)])
+                return super(Recorder, cls).parse_xmlelement(xmlelement, **options)
+
+        class Order(xsd.ComplexType):
+            lines = xsd.ListElement(Recorder, 'line')
+
+        previous = []
+        xml = b'<order>' + b'<line number="1"><sku>A</sku></line>' * 10 + b'</order>'
+        lines = list(Order.iterparse(BytesIO(xml), 'lines'))
+        assert_equals(10, len(lines))
+        # only the (cleared) previous item is left
+        assert_equals([[]] + [[0]] * 9, previous)
+
+    def test_iterparse_invalid_path(self):
+        with assert_raises(ValueError):
+            CompactShipment.iterparse(BytesIO(self.XML), 'order.unknown')
+        with assert_raises(ValueError):
+            CompactShipment.iterparse(BytesIO(self.XML), 'order')
+        with assert_raises(ValueError):
+            CompactShipment.iterparse(BytesIO(self.XML), 'order.lines', lazy=True)
+
+
+class StreamingRenderTest(unittest.TestCase):
+
+    def test_iterxml_and_write_xml(self):
+        flight = Flight.parsexml(XMLParsingTest.LIST_XML)
+        expected = flight.xml('flight', pretty_print=False)
+        assert_equals(expected, b''.join(flight.iterxml('flight')))
+        output = BytesIO()
+        flight.write_xml(output, 'flight')
+        assert_equals(expected, output.getvalue())
+
+        qualified = dict(namespace='http://flight.example', elementFormDefault=xsd.ElementFormDefault.QUALIFIED)
+        expected = flight.xml('flight', pretty_print=False, **qualified)
+        assert_equals(expected, b''.join(flight.iterxml('flight', **qualified)))
+
+    def test_list_from_generator(self):
+        lines = (CompactLine(number=i, sku='SKU-%d' % i) for i in range(1000))
+        shipment = CompactShipment(id='1', order=CompactOrder(lines=lines))
+        chunks = list(shipment.iterxml('shipment'))
+        self.assertTrue(len(chunks) > 1)
+        parsed = CompactShipment.parsexml(b''.join(chunks))
+        assert_equals(1000, len(parsed.order.lines))
+        assert_equals(CompactLine(number=999, sku='SKU-999'), parsed.order.lines[-1])
+
+    def test_list_occurs(self):
+        flight = Flight(passengers=iter(['p%d' % i for i in range(11)]))
+        with assert_raises(ValueError):
+            flight.write_xml(BytesIO(), 'flight')
+
+        class Order(xsd.ComplexType):
+            lines = xsd.ListElement(CompactLine, 'line', minOccurs=1)
+
+        with assert_raises(ValueError):
+            list(Order(lines=iter([])).iterxml('order'))
+
+
+class SchemaCompileTest(unittest.TestCase):
+    XML = b'''<ns0:order xmlns:ns0="http://order.example">
+  <ns0:id>4711</ns0:id>
+  <ns0:line number="1">
+    <ns0:sku>A-1</ns0:sku>
+    <ns0:price>1.5</ns0:price>
+  </ns0:line>
+  <ns0:line number="2">
+    <ns0:sku>B-2</ns0:sku>
+    <ns0:price xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:nil="true"/>
+  </ns0:line>
+  <ns0:note>first</ns0:note>
+  <ns0:name>Foo</ns0:name>
+</ns0:order>
+'''
+
+    def _schema(self):
+        class Line(xsd.ComplexType):
+            number = xsd.Attribute(xsd.Integer)
+            sku = xsd.Element(xsd.String(pattern=r'[A-Z]-\d'))
+            price = xsd.Element(xsd.Decimal, nillable=True)
+
+        class Person(xsd.Group):
+            name = xsd.Element(xsd.String)
+
+        class Order(xsd.ComplexType):
+            id = xsd.Element(xsd.String)
+            lines = xsd.ListElement(Line, 'line', maxOccurs=2)
+            notes = xsd.ListElement(xsd.String, 'note', minOccurs=0)
+            person = xsd.Ref(Person)
+
+        schema = xsd.Schema(
+            targetNamespace='http://order.example',
+            elementFormDefault=xsd.ElementFormDefault.QUALIFIED,
+            complexTypes=[Line, Order],
+            elements={'order': xsd.Element(Order)},
+        )
+        return schema, Order, Line
+
+    def test_compiled_parsing_and_rendering(self):
+        schema, Order, Line = self._schema()
+        order = Order.parsexml(self.XML)
+        assert_equals(self.XML, order.xml('order', namespace=schema.targetNamespace,
+                                          elementFormDefault=schema.elementFormDefault))
+        assert_equals(schema, schema.compile())
+        self.assertIsNotNone(Line._meta.compiled.parse)
+        self.assertIsNone(Order._meta.compiled.parse)  # references are not compiled
+
+        compiled_line = Line.parse_xmlelement(order._xmlelement[1])
+        assert_equals(order.lines[0], compiled_line)
+        assert_equals(Decimal('1.5'), compiled_line.price)
+        assert_equals(xsd.NIL, Line.parse_xmlelement(order._xmlelement[2]).price)
+        assert_equals(self.XML, Order.parsexml(self.XML).xml(
+            'order', namespace=schema.targetNamespace, elementFormDefault=schema.elementFormDefault))
+
+    def test_compiled_types_validate_values(self):
+        schema, Order, Line = self._schema()
+        schema.compile()
+        with assert_raises(ValueError):
+            Line.parsexml(b'<line number="1"><sku>invalid</sku></line>')
+        with assert_raises(ValueError):
+            Line.parsexml(b'<line number="x"><sku>A-1</sku></line>')
+        order = Order(id='1', lines=[Line(number=i, sku='A-1') for i in range(3)])
+        with assert_raises(ValueError):
+            order.xml('order')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -23,3 +23,10 @@ class XSDDateTest(PythonicTestCase):
 
         past = XSDDate(-12345, 4, 21)
         assert_equals(-12345, past.year)
+
+    def test_is_a_compact_value(self):
+        xsd_date = XSDDate(2014, 11, 13)
+        assert_raises(AttributeError, lambda: setattr(xsd_date, 'hour', 1))
+        assert_equals(XSDDate(2014, 11, 13), xsd_date)
+        assert_equals(hash(XSDDate(2014, 11, 13)), hash(xsd_date))
+        self.assertNotEqual(XSDDate(2014, 11, 14), xsd_date)